@@ -32,6 +32,14 @@ config.set_main_option("sqlalchemy.url", settings.get_db_url())
 # ... etc.
 
 
+def include_name(name, type_, parent_names) -> bool:
+    # Полнотекстовый индекс и его служебные таблицы создаются вручную
+    # (app/models/search.py) и не описаны в метаданных
+    if type_ == "table":
+        return not name.startswith("questions_fts")
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -50,6 +58,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -57,7 +66,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
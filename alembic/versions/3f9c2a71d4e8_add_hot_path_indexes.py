@@ -0,0 +1,51 @@
+"""add indexes on hot-path foreign keys
+
+Revision ID: 3f9c2a71d4e8
+Revises: b1350ac60957
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9c2a71d4e8"
+down_revision: Union[str, None] = "b1350ac60957"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_options_question_id"), "options", ["question_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_attemptanswers_test_attempt_id"),
+        "attemptanswers",
+        ["test_attempt_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_attemptanswers_question_id"),
+        "attemptanswers",
+        ["question_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_testattempts_user_id_end_time",
+        "testattempts",
+        ["user_id", "end_time"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_testattempts_user_id_end_time", table_name="testattempts")
+    op.drop_index(op.f("ix_attemptanswers_question_id"), table_name="attemptanswers")
+    op.drop_index(
+        op.f("ix_attemptanswers_test_attempt_id"), table_name="attemptanswers"
+    )
+    op.drop_index(op.f("ix_options_question_id"), table_name="options")
@@ -0,0 +1,61 @@
+"""add question content hash and soft delete
+
+Revision ID: 5b7e1d93c0a4
+Revises: 3f9c2a71d4e8
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.text import content_hash
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7e1d93c0a4"
+down_revision: Union[str, None] = "3f9c2a71d4e8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "questions", sa.Column("content_hash", sa.String(length=32), nullable=True)
+    )
+    op.add_column("questions", sa.Column("deleted_at", sa.DateTime(), nullable=True))
+
+    # Хеши существующих вопросов, иначе первая синхронизация сочтёт
+    # изменёнными их все и перепишет варианты ответов
+    connection = op.get_bind()
+    options: dict[int, list[tuple[str, bool]]] = {}
+    for question_id, option_text, is_correct in connection.execute(
+        sa.text("SELECT question_id, option_text, is_correct FROM options ORDER BY id")
+    ):
+        options.setdefault(question_id, []).append((option_text, bool(is_correct)))
+    params = [
+        {
+            "id": question_id,
+            "content_hash": content_hash(text, options.get(question_id, [])),
+        }
+        for question_id, text in connection.execute(
+            sa.text("SELECT id, text FROM questions")
+        )
+    ]
+    if params:
+        connection.execute(
+            sa.text("UPDATE questions SET content_hash = :content_hash WHERE id = :id"),
+            params,
+        )
+
+    op.create_index(
+        op.f("ix_questions_content_hash"), "questions", ["content_hash"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_questions_content_hash"), table_name="questions")
+    with op.batch_alter_table("questions") as batch_op:
+        batch_op.drop_column("deleted_at")
+        batch_op.drop_column("content_hash")
@@ -0,0 +1,60 @@
+"""add unique normalized text hash to questions
+
+Revision ID: 9c4d2e6f8a1b
+Revises: 5b7e1d93c0a4
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.text import text_hash
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4d2e6f8a1b"
+down_revision: Union[str, None] = "5b7e1d93c0a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "questions", sa.Column("text_hash", sa.String(length=32), nullable=True)
+    )
+
+    # Хеш получает только первый вопрос каждой группы дубликатов, остальные
+    # остаются без него и видны в отчёте о дубликатах
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text("SELECT id, text FROM questions WHERE deleted_at IS NULL ORDER BY id")
+    )
+    seen: set[str] = set()
+    params = []
+    for question_id, question_text in rows:
+        question_hash = text_hash(question_text)
+        if question_hash in seen:
+            continue
+        seen.add(question_hash)
+        params.append({"id": question_id, "text_hash": question_hash})
+    if params:
+        connection.execute(
+            sa.text("UPDATE questions SET text_hash = :text_hash WHERE id = :id"),
+            params,
+        )
+
+    op.create_index(
+        "uq_questions_text_hash",
+        "questions",
+        ["text_hash"],
+        unique=True,
+        sqlite_where=sa.text("deleted_at IS NULL AND text_hash IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_questions_text_hash", table_name="questions")
+    with op.batch_alter_table("questions") as batch_op:
+        batch_op.drop_column("text_hash")
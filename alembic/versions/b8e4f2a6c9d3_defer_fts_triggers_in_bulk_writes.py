@@ -0,0 +1,40 @@
+"""let bulk writes rebuild the full-text index themselves
+
+Revision ID: b8e4f2a6c9d3
+Revises: f3a9d5e7b2c1
+Create Date: 2026-10-18 00:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.search import (
+    QUESTIONS_FTS_BULK_TABLE,
+    QUESTIONS_FTS_TRIGGERS,
+    questions_fts_triggers,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e4f2a6c9d3"
+down_revision: Union[str, None] = "f3a9d5e7b2c1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _replace_triggers(deferrable: bool) -> None:
+    for trigger in QUESTIONS_FTS_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    for statement in questions_fts_triggers(deferrable=deferrable):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    op.execute(QUESTIONS_FTS_BULK_TABLE)
+    _replace_triggers(deferrable=True)
+
+
+def downgrade() -> None:
+    _replace_triggers(deferrable=False)
+    op.execute("DROP TABLE IF EXISTS questions_fts_bulk")
@@ -0,0 +1,38 @@
+"""add full-text index of questions
+
+Revision ID: d1a7f3b5c902
+Revises: 9c4d2e6f8a1b
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.search import (
+    QUESTIONS_FTS_BACKFILL,
+    QUESTIONS_FTS_TABLE,
+    QUESTIONS_FTS_TRIGGERS,
+    questions_fts_triggers,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "d1a7f3b5c902"
+down_revision: Union[str, None] = "9c4d2e6f8a1b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(QUESTIONS_FTS_TABLE)
+    for statement in questions_fts_triggers(deferrable=False):
+        op.execute(statement)
+
+    op.execute(QUESTIONS_FTS_BACKFILL)
+
+
+def downgrade() -> None:
+    for trigger in QUESTIONS_FTS_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS questions_fts")
@@ -0,0 +1,77 @@
+"""add per-user test summary
+
+Revision ID: e6b2c8d4f1a3
+Revises: d1a7f3b5c902
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e6b2c8d4f1a3"
+down_revision: Union[str, None] = "d1a7f3b5c902"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "userstats",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("correct_answers", sa.Integer(), nullable=False),
+        sa.Column("total_questions", sa.Integer(), nullable=False),
+        sa.Column("percent_sum", sa.Float(), nullable=False),
+        sa.Column("best_percent", sa.Float(), nullable=False),
+        sa.Column("last_attempt_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+
+    # Сводка по уже завершённым тестам
+    op.execute("""
+        INSERT INTO userstats (
+            user_id, attempts, correct_answers, total_questions,
+            percent_sum, best_percent, last_attempt_at
+        )
+        SELECT
+            user_id,
+            COUNT(*),
+            SUM(COALESCE(score, 0)),
+            SUM(COALESCE(total_questions, 0)),
+            SUM(percent),
+            MAX(percent),
+            MAX(end_time)
+        FROM (
+            SELECT
+                user_id, score, total_questions, end_time,
+                CASE WHEN total_questions > 0
+                    THEN COALESCE(score, 0) * 100.0 / total_questions
+                    ELSE 0.0
+                END AS percent
+            FROM testattempts
+            WHERE end_time IS NOT NULL
+        )
+        GROUP BY user_id
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table("userstats")
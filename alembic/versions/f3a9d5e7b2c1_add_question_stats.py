@@ -0,0 +1,65 @@
+"""add per-question answer counters
+
+Revision ID: f3a9d5e7b2c1
+Revises: e6b2c8d4f1a3
+Create Date: 2026-10-17 23:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "f3a9d5e7b2c1"
+down_revision: Union[str, None] = "e6b2c8d4f1a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "questionstats",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("correct_answers", sa.Integer(), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            server_default=sa.text("(CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["question_id"],
+            ["questions.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("question_id"),
+    )
+
+    # Счётчики по уже данным ответам
+    op.execute("""
+        INSERT INTO questionstats (
+            question_id, attempts, correct_answers, last_seen_at
+        )
+        SELECT
+            question_id,
+            COUNT(*),
+            SUM(CASE WHEN is_correct THEN 1 ELSE 0 END),
+            MAX(created_at)
+        FROM attemptanswers
+        GROUP BY question_id
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table("questionstats")
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -20,6 +21,39 @@ class Settings(BaseSettings):
     TOKEN: str
     SQLITE_DB_PATH: str
     ADMINS: list[int]
+    SHUFFLE_OPTIONS: bool = False
+    WRITE_QUEUE_MAX_BATCH: int = 100
+    WRITE_QUEUE_MAX_DELAY_MS: float = 5
+
+    SQLITE_PERFORMANCE_PROFILE: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 64_000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT_MS: int = 5_000
+    SQLITE_READ_POOL_SIZE: int = 4
+
+    BOT_MODE: Literal["polling", "webhook"] = "polling"
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+    WEBHOOK_PATH: str = "/webhook"
+    WEBHOOK_URL: str | None = None
+    WEBHOOK_SECRET: str | None = None
+    MAX_CONCURRENT_UPDATES: int = 100
+
+    SEND_RATE_GLOBAL: float = 30
+    SEND_RATE_PER_CHAT: float = 1
+    SEND_BURST_PER_CHAT: int = 3
+    SEND_RATE_PER_GROUP_PER_MINUTE: float = 20
+    SEND_MAX_RETRIES: int = 3
+
+    FSM_DB_PATH: str | None = None
+    FSM_CACHE_SIZE: int = 10_000
+    FSM_TTL_HOURS: float = 24
+    FSM_FLUSH_INTERVAL_MS: float = 200
+
+    INLINE_CACHE_TIME: int = 300
+    INLINE_CACHE_SIZE: int = 1_000
 
     @field_validator("ADMINS", mode="before")
     @classmethod
@@ -33,6 +67,30 @@ class Settings(BaseSettings):
     def get_db_url(self) -> str:
         return f"sqlite+aiosqlite:///{self.SQLITE_DB_PATH}"
 
+    def get_fsm_db_path(self) -> str:
+        """
+        FSM storage file, by default next to the main database.
+        """
+        if self.FSM_DB_PATH:
+            return self.FSM_DB_PATH
+        return str(Path(self.SQLITE_DB_PATH).with_name("fsm.db"))
+
+    def get_sqlite_pragmas(self) -> dict[str, str | int]:
+        """
+        Pragmas applied to every new SQLite connection, empty when the
+        performance profile is disabled.
+        """
+        if not self.SQLITE_PERFORMANCE_PROFILE:
+            return {}
+        return {
+            "journal_mode": self.SQLITE_JOURNAL_MODE,
+            "synchronous": self.SQLITE_SYNCHRONOUS,
+            "cache_size": -self.SQLITE_CACHE_SIZE_KB,
+            "mmap_size": self.SQLITE_MMAP_SIZE,
+            "busy_timeout": self.SQLITE_BUSY_TIMEOUT_MS,
+            "temp_store": "MEMORY",
+        }
+
 
 settings = Settings()
 
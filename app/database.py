@@ -1,22 +1,107 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime
-from sqlalchemy import Integer, func
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
+
+from sqlalchemy import Integer, event, func
 from sqlalchemy.orm import DeclarativeBase, declared_attr, Mapped, mapped_column
 from sqlalchemy.ext.asyncio import (
     AsyncAttrs,
+    AsyncSession,
     async_sessionmaker,
     create_async_engine,
     AsyncEngine,
 )
 
 from app.config import settings
+from app.logger_setup import get_logger
 
+logger = get_logger(__name__)
 
 DATABASE_URL = settings.get_db_url()
 
-engine: AsyncEngine = create_async_engine(
-    url=DATABASE_URL,
+
+def create_sqlite_engine(
+    url: str,
+    pragmas: dict[str, str | int],
+    query_only: bool = False,
+    pool_size: int = 1,
+) -> AsyncEngine:
+    """
+    Creates an engine whose connections get the given pragmas on connect.
+    Read-only engines additionally set query_only and skip journal_mode,
+    which only the writer may change.
+    """
+    engine = create_async_engine(url=url, pool_size=pool_size, max_overflow=0)
+
+    connection_pragmas = dict(pragmas)
+    if query_only:
+        connection_pragmas.pop("journal_mode", None)
+        connection_pragmas["query_only"] = 1
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in connection_pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+# Единственное соединение на запись и отдельный пул только для чтения:
+# в режиме WAL чтения не ждут коммитов
+engine: AsyncEngine = create_sqlite_engine(DATABASE_URL, settings.get_sqlite_pragmas())
+read_engine: AsyncEngine = create_sqlite_engine(
+    DATABASE_URL,
+    settings.get_sqlite_pragmas(),
+    query_only=True,
+    pool_size=settings.SQLITE_READ_POOL_SIZE,
 )
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+read_session_maker = async_sessionmaker(read_engine, expire_on_commit=False)
+
+# Сессия чтения обрабатываемого обновления, её открывает DatabaseSessionMiddleware
+update_session: ContextVar[AsyncSession | None] = ContextVar(
+    "update_session", default=None
+)
+
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """
+    Yields the read session of the current update, so all reads of an update
+    share one transaction, or a short-lived read-only session outside of one.
+    """
+    session = update_session.get()
+    if session is not None:
+        yield session
+        return
+    async with read_session_maker() as session:
+        yield session
+
+
+async def release_update_session() -> None:
+    """
+    Ends the read transaction of the current update and returns its
+    connection to the pool; the next read begins a new one.
+    """
+    session = update_session.get()
+    if session is not None and session.in_transaction():
+        # commit, а не rollback: rollback сбросил бы загруженные объекты
+        await session.commit()
+
+
+async def init_database() -> None:
+    """
+    Opens the writer connection first so it can switch the journal mode
+    before any reader holds the file.
+    """
+    async with engine.connect():
+        pass
 
 
 class Base(AsyncAttrs, DeclarativeBase):
@@ -30,3 +115,186 @@ class Base(AsyncAttrs, DeclarativeBase):
     @declared_attr.directive
     def __tablename__(cls) -> str:
         return cls.__name__.lower() + "s"
+
+
+T = TypeVar("T")
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+
+
+@dataclass
+class WriteQueueStats:
+    """
+    Snapshot of the write queue metrics.
+
+    Attributes:
+        depth (int): Jobs waiting to be committed.
+        batches (int): Transactions committed so far.
+        jobs (int): Jobs committed so far.
+        failed (int): Jobs that raised and were reported to their callers.
+        last_commit_ms (float): Latency of the latest transaction.
+        avg_commit_ms (float): Average transaction latency.
+        max_commit_ms (float): Slowest transaction so far.
+    """
+
+    depth: int
+    batches: int
+    jobs: int
+    failed: int
+    last_commit_ms: float
+    avg_commit_ms: float
+    max_commit_ms: float
+
+
+class WriteQueue:
+    """
+    Single writer that group-commits database writes.
+
+    Repositories submit jobs, coroutines that receive a session and stage
+    their changes in it. Jobs submitted within max_delay of each other, up to
+    max_batch of them, share one transaction. Each submit() resolves with the
+    job result once that transaction is committed. If a batch fails, its jobs
+    are retried one transaction each so one bad job only fails its own caller.
+
+    Until start() is called, jobs run immediately in their own transaction,
+    which keeps scripts and migrations working without a running loop task.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        max_batch: int = 100,
+        max_delay: float = 0.005,
+    ) -> None:
+        self._session_maker = session_maker
+        self._max_batch = max_batch
+        self._max_delay = max_delay
+        self._queue: asyncio.Queue[tuple[WriteJob, asyncio.Future]] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+        self._batches = 0
+        self._jobs = 0
+        self._failed = 0
+        self._last_commit_ms = 0.0
+        self._total_commit_ms = 0.0
+        self._max_commit_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="write-queue")
+
+    async def stop(self) -> None:
+        """
+        Commits everything already submitted and stops the writer.
+        """
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, job: WriteJob[T]) -> T:
+        # Соединение для чтения не нужно держать, пока запись ждёт коммита
+        await release_update_session()
+        if self._task is None:
+            return await self._run_single(job)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((job, future))
+        return await future
+
+    def stats(self) -> WriteQueueStats:
+        return WriteQueueStats(
+            depth=self._queue.qsize(),
+            batches=self._batches,
+            jobs=self._jobs,
+            failed=self._failed,
+            last_commit_ms=self._last_commit_ms,
+            avg_commit_ms=(
+                self._total_commit_ms / self._batches if self._batches else 0.0
+            ),
+            max_commit_ms=self._max_commit_ms,
+        )
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() < self._max_batch - 1:
+                await asyncio.sleep(self._max_delay)
+            while len(batch) < self._max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._commit_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit_batch(self, batch: list[tuple[WriteJob, asyncio.Future]]) -> None:
+        started = time.perf_counter()
+        try:
+            async with self._session_maker() as session:
+                results = [await job(session) for job, _ in batch]
+                await session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                self._fail(batch[0][1], e)
+                return
+            logger.warning(
+                f"Group commit of {len(batch)} jobs failed, retrying one by one: {e}"
+            )
+            for job, future in batch:
+                try:
+                    result = await self._run_single(job)
+                except Exception as job_error:
+                    self._fail(future, job_error)
+                else:
+                    self._resolve(future, result)
+            return
+
+        self._record_commit(len(batch), started)
+        for (_, future), result in zip(batch, results):
+            self._resolve(future, result)
+
+    async def _run_single(self, job: WriteJob[T]) -> T:
+        started = time.perf_counter()
+        async with self._session_maker() as session:
+            result = await job(session)
+            await session.commit()
+        self._record_commit(1, started)
+        return result
+
+    def _record_commit(self, jobs: int, started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._batches += 1
+        self._jobs += jobs
+        self._last_commit_ms = elapsed_ms
+        self._total_commit_ms += elapsed_ms
+        self._max_commit_ms = max(self._max_commit_ms, elapsed_ms)
+        logger.debug(
+            f"Committed {jobs} jobs in {elapsed_ms:.1f} ms, "
+            f"queue depth {self._queue.qsize()}"
+        )
+
+    def _resolve(self, future: asyncio.Future, result: Any) -> None:
+        if not future.done():
+            future.set_result(result)
+
+    def _fail(self, future: asyncio.Future, error: Exception) -> None:
+        self._failed += 1
+        logger.error(f"Write job failed: {error}")
+        if not future.done():
+            future.set_exception(error)
+
+
+write_queue = WriteQueue(
+    async_session_maker,
+    max_batch=settings.WRITE_QUEUE_MAX_BATCH,
+    max_delay=settings.WRITE_QUEUE_MAX_DELAY_MS / 1000,
+)
@@ -8,6 +8,11 @@ from app.handlers import (
     fallback,
     quiz,
     buttons,
+    reports,
+    import_questions,
+    search,
+    solver,
+    inline,
 )
 
 
@@ -18,5 +23,10 @@ def register_all_handlers(dp: Dispatcher) -> None:
     quiz_answers.register_answer_handlers(dp)
     quiz_test.register_test_handlers(dp)
     quiz_history.register_history_handler(dp)
+    reports.register_report_handlers(dp)
+    import_questions.register_import_handlers(dp)
+    search.register_search_handlers(dp)
+    solver.register_solver_handlers(dp)
+    inline.register_inline_handlers(dp)
     fallback.register_fallback_handler(dp)
     buttons.register_button_handlers(dp)
@@ -2,16 +2,24 @@ from aiogram import types, Dispatcher
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import async_session_maker
 from app.models import Question, Option
 from app.logger_setup import get_logger
 from app.repositories.questions import QuestionRepository
 from app.schemas.options import OptionCreate
 from app.schemas.questions import QuestionCreate
+from app.services.duplicates import duplicate_index
+from app.services.question_bank import question_bank
+from app.utils.text import text_hash
 
 logger = get_logger(__name__)
 
 
+DUPLICATE_MESSAGE = "Такой вопрос уже есть (id {question_id}). Введите другой вопрос:"
+
+
 class AddQuestionStates(StatesGroup):
     waiting_for_question_text = State()
     waiting_for_has_options = State()
@@ -20,6 +28,21 @@ class AddQuestionStates(StatesGroup):
     waiting_for_correct_options = State()
 
 
+async def find_duplicate(question_text: str) -> int | None:
+    await question_bank.ensure_loaded()
+    return duplicate_index.find(text_hash(question_text))
+
+
+async def report_duplicate(
+    message: types.Message, state: FSMContext, question_text: str
+) -> None:
+    # Вопрос с таким текстом успели добавить, пока заполнялись варианты
+    question_id = await find_duplicate(question_text)
+    await message.answer(DUPLICATE_MESSAGE.format(question_id=question_id))
+    await state.clear()
+    await state.set_state(AddQuestionStates.waiting_for_question_text)
+
+
 async def add_question_start(message: types.Message, state: FSMContext) -> None:
     await state.clear()
     await message.answer("Введите текст вопроса:")
@@ -31,6 +54,10 @@ async def process_question_text(message: types.Message, state: FSMContext) -> No
     if not question_text:
         await message.answer("Введите непустой вопрос:")
         return
+    question_id = await find_duplicate(question_text)
+    if question_id is not None:
+        await message.answer(DUPLICATE_MESSAGE.format(question_id=question_id))
+        return
     await state.update_data(question_text=question_text)
     await message.answer("Вопрос с вариантами ответа? (да/нет)")
     await state.set_state(AddQuestionStates.waiting_for_has_options)
@@ -53,14 +80,16 @@ async def process_has_options(message: types.Message, state: FSMContext) -> None
         await state.set_state(AddQuestionStates.waiting_for_answer)
 
 
-async def process_answer(message: types.Message, state: FSMContext) -> None:
+async def process_answer(
+    message: types.Message, state: FSMContext, session: AsyncSession
+) -> None:
     answer_text = message.text.strip()
     if not answer_text:
         await message.answer("Ответ не может быть пустым. Введите ответ:")
         return
     await state.update_data(answer_text=answer_text)
     data = await state.get_data()
-    question_repository = QuestionRepository()
+    question_repository = QuestionRepository(session)
     if not data.get("has_options"):
         question_schema = QuestionCreate(
             text=data["question_text"],
@@ -68,7 +97,11 @@ async def process_answer(message: types.Message, state: FSMContext) -> None:
             answer_text=answer_text,
             created_by=message.from_user.id,
         )
-        await question_repository.create_question(question_schema)
+        try:
+            await question_repository.create_question(question_schema)
+        except IntegrityError:
+            await report_duplicate(message, state, question_schema.text)
+            return
         await message.answer("Вопрос успешно добавлен!")
         await state.clear()
     else:
@@ -93,7 +126,9 @@ async def process_options(message: types.Message, state: FSMContext) -> None:
     await state.set_state(AddQuestionStates.waiting_for_correct_options)
 
 
-async def process_correct_options(message: types.Message, state: FSMContext) -> None:
+async def process_correct_options(
+    message: types.Message, state: FSMContext, session: AsyncSession
+) -> None:
     raw_input = message.text.strip()
     try:
         correct_indices = [int(x) - 1 for x in raw_input.split()]
@@ -128,10 +163,14 @@ async def process_correct_options(message: types.Message, state: FSMContext) ->
         for idx, option_text in enumerate(options)
     ]
 
-    question_repository = QuestionRepository()
-    await question_repository.create_question_with_options(
-        question_schema, option_schemes
-    )
+    question_repository = QuestionRepository(session)
+    try:
+        await question_repository.create_question_with_options(
+            question_schema, option_schemes
+        )
+    except IntegrityError:
+        await report_duplicate(message, state, question_schema.text)
+        return
 
     await message.answer("Вопрос успешно добавлен!")
     await state.clear()
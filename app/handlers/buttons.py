@@ -1,6 +1,7 @@
 from aiogram import types, Dispatcher
 from aiogram.filters.callback_data import CallbackData
 from aiogram.fsm.context import FSMContext
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class ButtonCallbackData(CallbackData, prefix="menu"):
@@ -11,6 +12,7 @@ async def process_button_click(
     callback_query: types.CallbackQuery,
     callback_data: ButtonCallbackData,
     state: FSMContext,
+    session: AsyncSession,
 ):
     try:
         if callback_data.action == "help":
@@ -21,7 +23,7 @@ async def process_button_click(
         elif callback_data.action == "list_questions":
             from app.handlers.quiz import list_questions_handler
 
-            await list_questions_handler(callback_query.message)
+            await list_questions_handler(callback_query.message, session)
 
         elif callback_data.action == "start_question":
             from app.handlers.quiz_answers import start_question
@@ -36,7 +38,7 @@ async def process_button_click(
         elif callback_data.action == "history":
             from app.handlers.quiz_history import view_test_history
 
-            await view_test_history(callback_query.message)
+            await view_test_history(callback_query.message, session)
 
         else:
             await callback_query.message.answer("Неизвестное действие.")
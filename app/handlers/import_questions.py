@@ -0,0 +1,150 @@
+import io
+import time
+
+from aiogram import Bot, Dispatcher, F, types
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+
+from app.config import settings
+from app.logger_setup import get_logger
+from app.repositories.test_attempts import TestAttemptRepository
+from app.services.question_bank import question_bank
+from app.services.sampler import question_sampler
+from app.services.send_scheduler import bulk_sends
+from app.utils.messages import split_message
+from app.utils.parse_question import (
+    ImportResult,
+    ParseError,
+    import_questions,
+    sync_questions,
+)
+
+logger = get_logger(__name__)
+
+# Правка сообщения о прогрессе не чаще, чем раз в PROGRESS_INTERVAL секунд
+PROGRESS_INTERVAL = 3
+
+
+class ImportStates(StatesGroup):
+    waiting_for_file = State()
+
+
+async def import_start(
+    message: types.Message, command: CommandObject, state: FSMContext, bot: Bot
+) -> None:
+    await state.clear()
+    await state.update_data(sync=command.args == "sync")
+    if message.document:
+        await import_file(message, state, bot)
+        return
+
+    await message.answer(
+        "Отправьте файл с вопросами (.txt, UTF-8).\n"
+        "Вопросы разделяются пустой строкой, правильные варианты начинаются с «-».\n"
+        "С командой /import sync файл заменяет банк: изменённые вопросы "
+        "обновляются, отсутствующие в файле удаляются."
+    )
+    await state.set_state(ImportStates.waiting_for_file)
+
+
+async def import_file(message: types.Message, state: FSMContext, bot: Bot) -> None:
+    data = await state.get_data()
+    await state.clear()
+    if data.get("sync"):
+        await sync_file(message, bot)
+        return
+
+    status = await message.answer("⏳ Импорт начат...")
+    last_update = time.monotonic()
+
+    async def report(result: ImportResult) -> None:
+        nonlocal last_update
+        if time.monotonic() - last_update < PROGRESS_INTERVAL:
+            return
+        last_update = time.monotonic()
+        await status.edit_text(
+            f"⏳ Импортировано вопросов: {result.imported}, "
+            f"ошибок: {len(result.errors)}..."
+        )
+
+    buffer = await bot.download(message.document)
+    result = ImportResult()
+    try:
+        with io.TextIOWrapper(buffer, encoding="utf-8-sig") as lines:
+            result = await import_questions(lines, on_progress=report)
+    except UnicodeDecodeError:
+        await message.answer(
+            "❌ Файл должен быть в кодировке UTF-8. "
+            "Вопросы до ошибки уже сохранены, проверьте их в /list_questions."
+        )
+        return
+
+    logger.info(
+        f"Пользователь {message.from_user.id} импортировал {result.imported} "
+        f"вопросов, пропущено {len(result.errors)}"
+    )
+    await status.edit_text(
+        f"✅ Импорт завершен: добавлено {result.imported} вопросов, "
+        f"пропущено {len(result.errors)}."
+    )
+    await send_errors(message, result.errors)
+
+
+async def sync_file(message: types.Message, bot: Bot) -> None:
+    status = await message.answer("⏳ Синхронизация начата...")
+    buffer = await bot.download(message.document)
+    try:
+        with io.TextIOWrapper(buffer, encoding="utf-8-sig") as lines:
+            result = await sync_questions(lines)
+    except UnicodeDecodeError:
+        await status.edit_text("❌ Файл должен быть в кодировке UTF-8.")
+        return
+
+    logger.info(
+        f"Пользователь {message.from_user.id} синхронизировал вопросы: "
+        f"+{result.inserted} ~{result.updated} -{result.deleted}"
+    )
+    await status.edit_text(
+        f"✅ Синхронизация завершена: добавлено {result.inserted}, "
+        f"обновлено {result.updated}, удалено {result.deleted}, "
+        f"без изменений {result.unchanged}, пропущено {len(result.errors)}."
+    )
+    await send_errors(message, result.errors)
+
+
+async def send_errors(message: types.Message, errors: list[ParseError]) -> None:
+    if not errors:
+        return
+    lines = ["⚠️ <b>Пропущенные вопросы:</b>\n"]
+    lines.extend(str(error) for error in errors)
+    with bulk_sends():
+        for chunk in split_message(lines):
+            await message.answer(chunk, parse_mode="HTML")
+
+
+async def reload_handler(message: types.Message) -> None:
+    # Импорт из консоли идёт в другом процессе, и кэш бота о нём не знает
+    question_bank.invalidate()
+    await question_bank.load()
+    question_sampler.load_stats(await TestAttemptRepository().get_question_stats())
+    logger.info(f"Пользователь {message.from_user.id} перезагрузил банк вопросов")
+    await message.answer(
+        f"🔄 Банк вопросов перезагружен: {await question_bank.count()} вопросов."
+    )
+
+
+async def import_waiting_for_file(message: types.Message) -> None:
+    await message.answer("Отправьте файл с вопросами документом.")
+
+
+def register_import_handlers(dp: Dispatcher) -> None:
+    is_admin = F.from_user.id.in_(settings.ADMINS)
+    dp.message.register(import_start, Command(commands=["import"]), is_admin)
+    dp.message.register(reload_handler, Command(commands=["reload"]), is_admin)
+    dp.message.register(
+        import_file, ImportStates.waiting_for_file, F.document, is_admin
+    )
+    dp.message.register(
+        import_waiting_for_file, ImportStates.waiting_for_file, is_admin
+    )
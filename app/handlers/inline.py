@@ -0,0 +1,42 @@
+from aiogram import Dispatcher, types
+from aiogram.types import InlineQueryResultArticle, InputTextMessageContent
+
+from app.config import settings
+from app.handlers.quiz import format_question_answer
+from app.handlers.solver import format_short_answer
+from app.services.inline_search import inline_search
+from app.services.question_bank import question_bank
+
+# Telegram показывает не больше 50 результатов за один ответ
+RESULTS_PER_ANSWER = 20
+
+
+async def inline_query_handler(inline_query: types.InlineQuery) -> None:
+    question_ids = await inline_search.search(inline_query.query)
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    page = question_ids[offset : offset + RESULTS_PER_ANSWER]
+    next_offset = offset + RESULTS_PER_ANSWER
+    if next_offset >= len(question_ids):
+        next_offset = ""
+
+    results = [
+        InlineQueryResultArticle(
+            id=str(question.id),
+            title=question.text[:100],
+            description=format_short_answer(question)[:100],
+            input_message_content=InputTextMessageContent(
+                message_text=format_question_answer(question), parse_mode="HTML"
+            ),
+        )
+        for question in await question_bank.get_many(page)
+    ]
+    await inline_query.answer(
+        results,
+        cache_time=settings.INLINE_CACHE_TIME,
+        is_personal=False,
+        next_offset=str(next_offset),
+    )
+
+
+def register_inline_handlers(dp: Dispatcher) -> None:
+    dp.inline_query.register(inline_query_handler)
@@ -1,75 +1,113 @@
 from html import escape as html_escape
 from aiogram import types, Dispatcher, html
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command, CommandObject
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
-from sqlalchemy import delete
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import async_session_maker
 from app.handlers.buttons import get_help_keyboard
-from app.models import Question
 from app.logger_setup import get_logger
 from app.repositories.questions import QuestionRepository
+from app.services.question_bank import QuestionRecord, question_bank
 
 logger = get_logger(__name__)
 
 
-async def list_questions_handler(message: types.Message, page: int = 0) -> None:
-    QUESTIONS_PER_PAGE = 20
-    question_repository = QuestionRepository()
-    questions = await question_repository.get_questions()
+QUESTIONS_PER_PAGE = 20
 
-    if not questions:
-        await message.answer("📚 *Нет доступных вопросов.*", parse_mode="Markdown")
-        return
-
-    total_pages = (len(questions) + QUESTIONS_PER_PAGE - 1) // QUESTIONS_PER_PAGE
 
-    if page < 0 or page >= total_pages:
-        await message.answer("❌ *Некорректная страница.*", parse_mode="Markdown")
-        return
+async def render_questions_page(
+    session: AsyncSession,
+    page: int,
+    after_id: int | None = None,
+    before_id: int | None = None,
+) -> tuple[str, InlineKeyboardMarkup] | None:
+    total_questions = await question_bank.count()
+    questions = await QuestionRepository(session).get_question_page(
+        QUESTIONS_PER_PAGE, after_id=after_id, before_id=before_id
+    )
+    if not questions:
+        return None
 
-    start = page * QUESTIONS_PER_PAGE
-    end = start + QUESTIONS_PER_PAGE
-    page_questions = questions[start:end]
+    total_pages = max(
+        (total_questions + QUESTIONS_PER_PAGE - 1) // QUESTIONS_PER_PAGE, page + 1
+    )
 
     response_lines = ["📋 *Список вопросов*\n"]
-    for q in page_questions:
-        truncated_text = q.text if len(q.text) < 50 else q.text[:47] + "..."
-        response_lines.append(f"└ `{q.id:03d}` • _{html_escape(truncated_text)}_")
+    for question_id, text in questions:
+        truncated_text = text if len(text) < 50 else text[:47] + "..."
+        response_lines.append(
+            f"└ `{question_id:03d}` • _{html_escape(truncated_text)}_"
+        )
 
     footer = f"\n📌 Страница {page + 1} из {total_pages}"
     response = "\n".join(response_lines) + footer
 
+    # Страницы адресуются граничным id, а не смещением
+    first_id, last_id = questions[0][0], questions[-1][0]
     keyboard_buttons = []
     if page > 0:
         keyboard_buttons.append(
             InlineKeyboardButton(
-                text="◀️ Назад", callback_data=f"questions_page:{page - 1}"
+                text="◀️ Назад",
+                callback_data=f"questions_page:{page - 1}:before:{first_id}",
             )
         )
     if page < total_pages - 1:
         keyboard_buttons.append(
             InlineKeyboardButton(
-                text="Вперед ▶️", callback_data=f"questions_page:{page + 1}"
+                text="Вперед ▶️",
+                callback_data=f"questions_page:{page + 1}:after:{last_id}",
             )
         )
     keyboard = InlineKeyboardMarkup(inline_keyboard=[keyboard_buttons])
+    return response, keyboard
+
+
+async def list_questions_handler(message: types.Message, session: AsyncSession) -> None:
+    rendered = await render_questions_page(session, page=0)
+    if rendered is None:
+        await message.answer("📚 *Нет доступных вопросов.*", parse_mode="Markdown")
+        return
 
+    response, keyboard = rendered
     await message.answer(response, reply_markup=keyboard, parse_mode="Markdown")
 
 
-async def questions_pagination(callback_query: types.CallbackQuery):
-    page = int(callback_query.data.split(":")[1])
+async def questions_pagination(
+    callback_query: types.CallbackQuery, session: AsyncSession
+):
+    parts = callback_query.data.split(":")
+    if len(parts) == 4:
+        page, direction, anchor_id = int(parts[1]), parts[2], int(parts[3])
+    else:
+        # Кнопки старых сообщений несут только номер страницы
+        page, direction, anchor_id = 0, "after", None
 
-    await callback_query.message.delete()
-    await list_questions_handler(callback_query.message, page)
+    if direction == "before":
+        rendered = await render_questions_page(session, page, before_id=anchor_id)
+    else:
+        rendered = await render_questions_page(session, page, after_id=anchor_id)
+
+    if rendered is None:
+        await callback_query.answer("❌ Некорректная страница.")
+        return
+
+    response, keyboard = rendered
+    try:
+        await callback_query.message.edit_text(
+            response, reply_markup=keyboard, parse_mode="Markdown"
+        )
+    except TelegramBadRequest as e:
+        # Повторное нажатие на ту же кнопку
+        if "message is not modified" not in str(e):
+            raise
+    await callback_query.answer()
 
 
 async def delete_question_handler(
-    message: types.Message, command: CommandObject
+    message: types.Message, command: CommandObject, session: AsyncSession
 ) -> None:
     if not command.args:
         await message.answer("Укажите id вопроса. Например: /delete_question 1")
@@ -81,7 +119,7 @@ async def delete_question_handler(
         await message.answer("Id вопроса должен быть числом.")
         return
 
-    question_repository = QuestionRepository()
+    question_repository = QuestionRepository(session)
     try:
         if await question_repository.delete_question(question_id):
             await message.answer(f"Вопрос с id {question_id} успешно удалён.")
@@ -92,6 +130,27 @@ async def delete_question_handler(
         await message.answer("Произошла ошибка при удалении вопроса. Попробуйте позже.")
 
 
+def format_question_answer(question: QuestionRecord) -> str:
+    """
+    Renders a question with its correct answer highlighted, as HTML.
+    """
+    response = f"Вопрос: {html_escape(question.text)}\n\n"
+
+    if question.has_options:
+        options = question.options
+        if options:
+            for idx, option in enumerate(options, start=1):
+                if option.is_correct:
+                    response += f"{idx}. <b>{html_escape(option.text)}</b>\n"
+                else:
+                    response += f"{idx}. {html_escape(option.text)}\n"
+        else:
+            response += "Варианты ответа не найдены."
+    else:
+        response += f"Ответ: {html_escape(question.answer or 'Не указан')}"
+    return response
+
+
 async def solve_question_handler(
     message: types.Message, command: CommandObject
 ) -> None:
@@ -105,34 +164,12 @@ async def solve_question_handler(
         await message.answer("Id вопроса должен быть числом.")
         return
 
-    async with async_session_maker() as session:
-        query = (
-            select(Question)
-            .options(selectinload(Question.options))
-            .where(Question.id == question_id)
-        )
-        result = await session.execute(query)
-        question = result.scalar()
-        if not question:
-            await message.answer(f"Вопрос с id {question_id} не найден.")
-            return
-
-        response = f"Вопрос: {html_escape(question.text)}\n\n"
-
-        if question.has_options:
-            options = question.options
-            if options:
-                for idx, option in enumerate(options, start=1):
-                    if option.is_correct:
-                        response += f"{idx}. <b>{html_escape(option.option_text)}</b>\n"
-                    else:
-                        response += f"{idx}. {html_escape(option.option_text)}\n"
-            else:
-                response += "Варианты ответа не найдены."
-        else:
-            response += f"Ответ: {html_escape(question.answer_text or 'Не указан')}"
+    question = await question_bank.get(question_id)
+    if not question:
+        await message.answer(f"Вопрос с id {question_id} не найден.")
+        return
 
-        await message.answer(response, parse_mode="HTML")
+    await message.answer(format_question_answer(question), parse_mode="HTML")
 
 
 async def help_handler(message: types.Message) -> None:
@@ -3,9 +3,11 @@ from aiogram.types import Message, PollAnswer
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from sqlalchemy import select
-from app.database import async_session_maker
-from app.models import Question, Option
+from app.config import settings
+from app.services.grading import answer_mask, correct_mask, option_order
+from app.services.question_bank import question_bank
+
+QUESTION_DELETED = "🗑 Вопрос был удалён, ответ не засчитан."
 
 
 class AnswerState(StatesGroup):
@@ -29,33 +31,57 @@ async def process_question_id(message: Message, state: FSMContext):
 
 
 async def answer_question(message: Message, state: FSMContext, question_id: int):
-    async with async_session_maker() as session:
-        question = await session.get(Question, question_id)
-        if not question:
-            await message.answer("Вопрос с указанным ID не найден.")
-            return
-
-        await state.update_data(question_id=question_id)
-
-        if question.has_options:
-            options = await session.execute(
-                select(Option).where(Option.question_id == question.id)
-            )
-            options = options.scalars().all()
-
-            option_texts = [opt.option_text for opt in options]
-            poll = await message.answer_poll(
-                question=question.text,
-                options=option_texts,
-                type="regular",
-                allows_multiple_answers=True,
-                is_anonymous=False,
-            )
-            await state.update_data(current_poll_id=poll.poll.id)
-        else:
-            await message.answer(question.text)
-
-        await state.set_state(AnswerState.answering)
+    question = await question_bank.get(question_id)
+    if not question:
+        await message.answer("Вопрос с указанным ID не найден.")
+        return
+    if not question.is_eligible:
+        await message.answer(f"Вопрос с указанным ID некорректен: {question.problem}.")
+        return
+
+    await state.update_data(question_id=question_id)
+
+    if question.has_options:
+        order = option_order(question, shuffle=settings.SHUFFLE_OPTIONS)
+        option_texts = [question.options[index].text for index in order]
+        poll = await message.answer_poll(
+            question=question.text,
+            options=option_texts,
+            type="regular",
+            allows_multiple_answers=True,
+            is_anonymous=False,
+        )
+        await state.update_data(
+            current_poll_id=poll.poll.id,
+            poll_order=order,
+            correct_mask=correct_mask(question, order),
+            # Ответ хранится вместе с вопросом, чтобы его можно было проверить,
+            # даже если вопрос удалят до ответа пользователя
+            correct_answer="\n".join(
+                option.text for option in question.correct_options
+            ),
+        )
+    else:
+        await message.answer(question.text)
+        await state.update_data(correct_answer=question.answer)
+
+    await state.set_state(AnswerState.answering)
+
+
+async def stored_answer(data: dict) -> str | None:
+    """
+    Correct answer saved when the question was sent. Data saved before it
+    was stored there falls back to the question bank; None means the
+    question has been deleted since.
+    """
+    if "correct_answer" in data:
+        return data["correct_answer"]
+    question = await question_bank.get(data["question_id"])
+    if question is None:
+        return None
+    if question.has_options:
+        return "\n".join(option.text for option in question.correct_options)
+    return question.answer
 
 
 async def process_poll_answer(poll_answer: PollAnswer, state: FSMContext, bot: Bot):
@@ -64,50 +90,40 @@ async def process_poll_answer(poll_answer: PollAnswer, state: FSMContext, bot: B
     if poll_answer.poll_id != data.get("current_poll_id"):
         return
 
-    async with async_session_maker() as session:
-        question = await session.get(Question, data["question_id"])
-        options = await session.execute(
-            select(Option).where(Option.question_id == question.id)
-        )
-        options = options.scalars().all()
-
-        option_mapping = {index: option.id for index, option in enumerate(options)}
-        selected_option_ids = [
-            option_mapping[index] for index in poll_answer.option_ids
-        ]
-
-        correct_options = [option for option in options if option.is_correct]
-        correct_option_ids = [option.id for option in correct_options]
-        is_correct = set(selected_option_ids) == set(correct_option_ids)
-
-        result_message = (
-            "✅ Верно!"
-            if is_correct
-            else f"❌ Неверно!\nПравильный ответ:\n{chr(10).join(opt.option_text for opt in correct_options)}"
-        )
-        await bot.send_message(poll_answer.user.id, result_message, parse_mode="HTML")
+    correct_answer = await stored_answer(data)
+    if correct_answer is None:
+        await bot.send_message(poll_answer.user.id, QUESTION_DELETED)
         await state.clear()
+        return
+
+    is_correct = answer_mask(poll_answer.option_ids) == data["correct_mask"]
+    result_message = (
+        "✅ Верно!"
+        if is_correct
+        else f"❌ Неверно!\nПравильный ответ:\n{correct_answer}"
+    )
+    await bot.send_message(poll_answer.user.id, result_message, parse_mode="HTML")
+    await state.clear()
 
 
 async def process_text_answer(message: Message, state: FSMContext):
     data = await state.get_data()
 
-    async with async_session_maker() as session:
-        question = await session.get(Question, data["question_id"])
-        result = await session.execute(
-            select(Option).where(Option.question_id == question.id)
-        )
+    correct_answer = await stored_answer(data)
+    if correct_answer is None:
+        await message.answer(QUESTION_DELETED)
+        await state.clear()
+        return
 
-        answer = result.scalar_one_or_none()
-        is_correct = message.text.lower() == answer.option_text.lower()
+    is_correct = message.text.lower() == correct_answer.lower()
 
-        result_message = (
-            "✅ Верно!"
-            if is_correct
-            else f"❌ Неверно!\nПравильный ответ: {answer.option_text}"
-        )
-        await message.answer(result_message, parse_mode="HTML")
-        await state.clear()
+    result_message = (
+        "✅ Верно!"
+        if is_correct
+        else f"❌ Неверно!\nПравильный ответ: {correct_answer}"
+    )
+    await message.answer(result_message, parse_mode="HTML")
+    await state.clear()
 
 
 def register_answer_handlers(dp: Dispatcher):
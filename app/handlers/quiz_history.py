@@ -1,54 +1,120 @@
-from aiogram import types, Dispatcher
+from aiogram import types, Dispatcher, F
+from aiogram.exceptions import TelegramBadRequest
 from aiogram.filters import Command
-from sqlalchemy import select
-from app.database import async_session_maker
-from app.models import TestAttempt
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.repositories.test_attempts import TestAttemptRepository
 
-async def view_test_history(message: types.Message):
+ATTEMPTS_PER_PAGE = 10
+
+
+async def render_history_page(
+    session: AsyncSession,
+    user_id: int,
+    page: int,
+    after_id: int | None = None,
+    before_id: int | None = None,
+) -> tuple[str, InlineKeyboardMarkup] | None:
+    repository = TestAttemptRepository(session)
+    stat = await repository.get_user_stat(user_id)
+    if stat is None or not stat.attempts:
+        return None
+    attempts = await repository.get_history_page(
+        user_id, ATTEMPTS_PER_PAGE, after_id=after_id, before_id=before_id
+    )
+    if not attempts:
+        return None
+
+    total_pages = max((stat.attempts + ATTEMPTS_PER_PAGE - 1) // ATTEMPTS_PER_PAGE, 1)
+    history_message = (
+        "📜 <b>История ваших тестов</b>\n"
+        f"🧮 Всего тестов: {stat.attempts}\n"
+        f"📊 Средний результат: {stat.average_percent:.1f}%\n"
+        f"🏆 Лучший результат: {stat.best_percent:.1f}%\n\n"
+    )
+    # Попытки нумеруются от первой, а страницы идут от последней
+    number = stat.attempts - page * ATTEMPTS_PER_PAGE
+    for i, attempt in enumerate(attempts):
+        end_time_str = attempt.end_time.strftime("%d.%m.%Y %H:%M")
+        correct_answers = attempt.score or 0
+        total_questions = attempt.total_questions or 0
+        percent = (
+            round(correct_answers / total_questions * 100, 2) if total_questions else 0
+        )
+        history_message += (
+            f"📝 <b>Попытка #{number - i}</b>\n"
+            f"📆 Дата завершения: <i>{end_time_str}</i>\n"
+            f"✅ Результат: {correct_answers} из {total_questions}\n"
+            f"📊 Процент выполнения: {percent}%\n\n"
+        )
+    history_message += f"📌 Страница {page + 1} из {total_pages}"
+
+    first_id, last_id = attempts[0].id, attempts[-1].id
+    keyboard_buttons = []
+    if page > 0:
+        keyboard_buttons.append(
+            InlineKeyboardButton(
+                text="◀️ Новее",
+                callback_data=f"history_page:{page - 1}:before:{first_id}",
+            )
+        )
+    if page < total_pages - 1:
+        keyboard_buttons.append(
+            InlineKeyboardButton(
+                text="Старее ▶️",
+                callback_data=f"history_page:{page + 1}:after:{last_id}",
+            )
+        )
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[keyboard_buttons])
+    return history_message, keyboard
+
+
+async def view_test_history(message: types.Message, session: AsyncSession):
     if hasattr(message, "via_bot"):
         user_id = message.chat.id
     else:
         user_id = message.from_user.id
 
-    async with async_session_maker() as session:
-        test_attempts = await session.execute(
-            select(TestAttempt)
-            .where(TestAttempt.user_id == user_id)
-            .order_by(TestAttempt.end_time.desc())
-        )
-        test_attempts = test_attempts.scalars().all()
-
-    if not test_attempts:
+    rendered = await render_history_page(session, user_id, page=0)
+    if rendered is None:
         await message.answer("🚫 История тестов отсутствует.")
         return
 
-    history_message = "📜 <b>История ваших тестов:</b>\n"
-    for i, attempt in enumerate(reversed(test_attempts), start=1):
-        end_time_str = (
-            attempt.end_time.strftime("%d.%m.%Y %H:%M")
-            if attempt.end_time
-            else "⏳ Тест не завершен"
-        )
-        correct_answers = attempt.score or 0
-        total_questions = attempt.total_questions or 0
+    history_message, keyboard = rendered
+    await message.answer(history_message, reply_markup=keyboard, parse_mode="HTML")
 
-        if total_questions > 0:
-            result = f"{correct_answers} из {total_questions}"
-            percent = round((correct_answers / total_questions) * 100, 2)
-        else:
-            result = "Не завершен"
-            percent = 0
 
-        history_message += (
-            f"📝 <b>Попытка #{i}</b>\n"
-            f"📆 Дата завершения: <i>{end_time_str}</i>\n"
-            f"✅ Результат: {result}\n"
-            f"📊 Процент выполнения: {percent}%\n\n"
+async def history_pagination(
+    callback_query: types.CallbackQuery, session: AsyncSession
+) -> None:
+    _, page, direction, anchor_id = callback_query.data.split(":")
+    page, anchor_id = int(page), int(anchor_id)
+    user_id = callback_query.from_user.id
+
+    if direction == "before":
+        rendered = await render_history_page(
+            session, user_id, page, before_id=anchor_id
         )
+    else:
+        rendered = await render_history_page(session, user_id, page, after_id=anchor_id)
 
-    await message.answer(history_message, parse_mode="HTML")
+    if rendered is None:
+        await callback_query.answer("❌ Некорректная страница.")
+        return
+
+    history_message, keyboard = rendered
+    try:
+        await callback_query.message.edit_text(
+            history_message, reply_markup=keyboard, parse_mode="HTML"
+        )
+    except TelegramBadRequest as e:
+        # Повторное нажатие на ту же кнопку
+        if "message is not modified" not in str(e):
+            raise
+    await callback_query.answer()
 
 
 def register_history_handler(dp: Dispatcher):
     dp.message.register(view_test_history, Command("history"))
+    dp.callback_query.register(history_pagination, F.data.startswith("history_page:"))
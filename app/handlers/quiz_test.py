@@ -10,9 +10,17 @@ from aiogram.types import (
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from sqlalchemy import select, func
-from app.database import async_session_maker
-from app.models import Question, TestAttempt, AttemptAnswer, Option
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.repositories.test_attempts import TestAttemptRepository
+from app.services.question_bank import (
+    MAX_QUESTION_LENGTH,
+    Eligibility,
+    question_bank,
+)
+from app.services.grading import answer_mask, correct_mask, option_order
+from app.services.sampler import question_sampler
+from app.services.test_session import TestSession
 
 
 class TestStates(StatesGroup):
@@ -21,9 +29,8 @@ class TestStates(StatesGroup):
 
 
 async def start_test(message: Message, state: FSMContext):
-    async with async_session_maker() as session:
-        total_questions = await session.execute(select(func.count(Question.id)))
-        total_questions = total_questions.scalar()
+    await question_bank.ensure_loaded()
+    total_questions = len(question_sampler)
 
     kb = ReplyKeyboardMarkup(
         keyboard=[[KeyboardButton(text="Завершить тест")]],
@@ -37,9 +44,11 @@ async def start_test(message: Message, state: FSMContext):
     await state.set_state(TestStates.waiting_for_questions_count)
 
 
-async def process_questions_count(message: Message, state: FSMContext):
+async def process_questions_count(
+    message: Message, state: FSMContext, session: AsyncSession
+):
     if message.text == "Завершить тест":
-        await finish_test(message, state)
+        await finish_test(message, state, session)
         return
 
     if not message.text.isdigit():
@@ -47,119 +56,113 @@ async def process_questions_count(message: Message, state: FSMContext):
         return
 
     questions_count = int(message.text)
-    async with async_session_maker() as session:
-        questions = await session.execute(
-            select(Question).order_by(func.random()).limit(questions_count)
-        )
-        questions = questions.scalars().all()
+    await question_bank.ensure_loaded()
+    questions = await question_bank.get_many(question_sampler.sample(questions_count))
 
-        test_attempt = TestAttempt(
-            user_id=message.from_user.id, total_questions=len(questions)
-        )
-        session.add(test_attempt)
-        await session.commit()
-
-        await state.update_data(
-            current_question=0,
-            questions=[q.id for q in questions],
-            test_attempt_id=test_attempt.id,
-            start_time=datetime.now(),
-        )
+    test_attempt = await TestAttemptRepository(session).create_attempt(
+        user_id=message.from_user.id, total_questions=len(questions)
+    )
+    test_session = TestSession(questions, test_attempt.id, datetime.now())
+    await state.update_data(test_session=test_session)
 
-    await show_next_question(message, state)
+    await show_next_question(message, state, session)
     await state.set_state(TestStates.answering_questions)
 
 
-async def show_next_question(message: Message, state: FSMContext):
+async def get_test_session(state: FSMContext) -> TestSession | None:
     data = await state.get_data()
-    current_question = data["current_question"]
-    questions = data["questions"]
+    return data.get("test_session")
 
-    if current_question >= len(questions):
-        await finish_test(message, state)
-        return
 
-    async with async_session_maker() as session:
-        question = await session.get(Question, questions[current_question])
-
-        if question.has_options:
-            options = await session.execute(
-                select(Option).where(Option.question_id == question.id)
-            )
-            options = options.scalars().all()
-
-            if len(options) < 2:
-                await message.answer(
-                    f"Ошибка: Вопрос {current_question + 1} не имеет достаточного количества вариантов ответа."
-                )
-                data["current_question"] += 1
-                await state.update_data(data)
-                await show_next_question(message, state)
-                return
-
-            # Обрезаем длинные варианты ответов
-            option_texts = []
-            for opt in options:
-                text = opt.option_text
-                if len(text) > 97:  # Оставляем место для "..."
-                    text = text[:97] + "..."
-                option_texts.append(text)
-
-            question_text = question.text
-            if len(question_text) > 300:
-                question_text = question_text[:297] + "..."
-
-            poll = await message.answer_poll(
-                question=f"{current_question + 1}. {question_text}",
-                options=option_texts,
-                type="regular",
-                allows_multiple_answers=True,
-                is_anonymous=False,
-            )
-
-            await state.update_data(current_poll_id=poll.poll.id)
-        else:
-            if len(question.text) > 300:
-                await message.answer(
-                    f"Ошибка: Вопрос {current_question + 1} превышает ограничение в 300 символов."
-                )
-            else:
-                await message.answer(f"{current_question + 1}. {question.text}")
-
-
-async def process_poll_answer(poll_answer: PollAnswer, state: FSMContext, bot: Bot):
-    data = await state.get_data()
+async def save_test_session(state: FSMContext, test_session: TestSession) -> None:
+    await state.update_data(test_session=test_session)
 
-    if poll_answer.poll_id != data.get("current_poll_id"):
-        return
 
-    selected_options = poll_answer.option_ids
+async def show_next_question(
+    message: Message, state: FSMContext, session: AsyncSession
+):
+    test_session = await get_test_session(state)
+    if test_session is None:
+        await finish_test(message, state, session)
+        return
 
-    async with async_session_maker() as session:
-        question_id = data["questions"][data["current_question"]]
+    if test_session.questions is None:
+        # Сессия прочитана из хранилища после перезапуска: вопросы находятся
+        # одним обращением к банку
+        questions = await question_bank.get_many(test_session.question_ids)
+        test_session.restore({question.id: question for question in questions})
+
+    question = None
+    while not test_session.finished:
+        question = test_session.current_question
+        if question is not None and question.is_eligible:
+            break
+        # Вопрос удалили или испортили, пока бот перезапускался, — пропускаем его
+        test_session.advance()
+
+    if question is None:
+        await save_test_session(state, test_session)
+        await finish_test(message, state, session)
+        return
 
-        options = await session.execute(
-            select(Option).where(Option.question_id == question_id)
+    number = test_session.cursor + 1
+    if question.eligibility is Eligibility.POLL:
+        order = option_order(question, shuffle=settings.SHUFFLE_OPTIONS)
+
+        # Обрезаем длинные варианты ответов
+        option_texts = []
+        for option_index in order:
+            text = question.options[option_index].text
+            if len(text) > 97:  # Оставляем место для "..."
+                text = text[:97] + "..."
+            option_texts.append(text)
+
+        question_text = question.text
+        if len(question_text) > MAX_QUESTION_LENGTH:
+            question_text = question_text[: MAX_QUESTION_LENGTH - 3] + "..."
+
+        version = test_session.version
+        poll = await message.answer_poll(
+            question=f"{number}. {question_text}",
+            options=option_texts,
+            type="regular",
+            allows_multiple_answers=True,
+            is_anonymous=False,
         )
-        options = options.scalars().all()
+        if test_session.version != version:
+            # Пока отправлялся опрос, сессия ушла вперёд или тест завершили
+            return
+
+        test_session.show_poll(
+            poll.poll.id,
+            order,
+            correct_mask(question, order),
+            "\n".join(option.text for option in question.correct_options),
+        )
+    else:
+        await message.answer(f"{number}. {question.text}")
+        test_session.show_text(question.answer)
+    await save_test_session(state, test_session)
 
-        option_mapping = {index: option.id for index, option in enumerate(options)}
 
-        correct_options = [option for option in options if option.is_correct]
-        correct_option_ids = [option.id for option in correct_options]
-        correct_option_texts = [option.option_text for option in correct_options]
+async def process_poll_answer(
+    poll_answer: PollAnswer, state: FSMContext, bot: Bot, session: AsyncSession
+):
+    test_session = await get_test_session(state)
 
-        selected_option_ids = [option_mapping[index] for index in selected_options]
-        is_correct = set(selected_option_ids) == set(correct_option_ids)
+    if test_session is None or poll_answer.poll_id != test_session.poll_id:
+        return
 
-        answer = AttemptAnswer(
-            test_attempt_id=data["test_attempt_id"],
-            question_id=question_id,
-            is_correct=is_correct,
-        )
-        session.add(answer)
+    # Ответ проверяется по сессии: вопрос могли удалить, пока шёл опрос
+    question_id = test_session.current_question_id
+    correct_answer = test_session.answer
+    is_correct = answer_mask(poll_answer.option_ids) == test_session.correct_mask
+    test_session.advance(is_correct)
+    await save_test_session(state, test_session)
 
-        await session.commit()
+    await TestAttemptRepository(session).add_answer(
+        test_session.test_attempt_id, question_id, is_correct
+    )
 
     user_id = poll_answer.user.id
 
@@ -172,63 +175,59 @@ async def process_poll_answer(poll_answer: PollAnswer, state: FSMContext, bot: B
     else:
         await bot.send_message(
             user_id,
-            f"❌ <b>Неверно!</b>\n\n"
-            f"<b>Правильный ответ:</b>\n{'\n'.join(correct_option_texts)}",
+            f"❌ <b>Неверно!</b>\n\n<b>Правильный ответ:</b>\n{correct_answer}",
             parse_mode="HTML",
         )
 
-    data["current_question"] += 1
-    await state.update_data(data)
-
     next_question_message = await bot.send_message(
         user_id, "🔄 Переходим к следующему вопросу..."
     )
-    await show_next_question(next_question_message, state)
+    await show_next_question(next_question_message, state, session)
 
 
-async def process_text_answer(message: Message, state: FSMContext):
+async def process_text_answer(
+    message: Message, state: FSMContext, session: AsyncSession
+):
     if message.text == "Завершить тест":
-        await finish_test(message, state)
+        await finish_test(message, state, session)
         return
 
-    data = await state.get_data()
-    async with async_session_maker() as session:
-        question_id = data["questions"][data["current_question"]]
-        question = await session.get(Question, question_id)
-        result = await session.execute(
-            select(Option).where(Option.question_id == question.id)
-        )
+    test_session = await get_test_session(state)
+    if test_session is None or test_session.finished:
+        await finish_test(message, state, session)
+        return
 
-        answer_ = result.scalar_one_or_none()
-        is_correct = message.text.lower() == answer_.option_text.lower()
+    # Текстом отвечают только на вопрос без вариантов, и проверка идёт по
+    # сессии, даже если вопрос уже удалили
+    if test_session.poll_id is not None or test_session.answer is None:
+        return
 
-        answer = AttemptAnswer(
-            test_attempt_id=data["test_attempt_id"],
-            question_id=question_id,
-            is_correct=is_correct,
-        )
-        session.add(answer)
-        await session.commit()
+    question_id = test_session.current_question_id
+    correct_answer = test_session.answer
+    is_correct = message.text.lower() == correct_answer.lower()
+    test_session.advance(is_correct)
+    await save_test_session(state, test_session)
+
+    await TestAttemptRepository(session).add_answer(
+        test_session.test_attempt_id, question_id, is_correct
+    )
 
     if is_correct:
         await message.answer("✅ <b>Верно!</b>", parse_mode="HTML")
     else:
         await message.answer(
-            f"❌ <b>Неверно!</b>\n\n"
-            f"<b>Правильный ответ:</b> {answer_.option_text}\n",
+            f"❌ <b>Неверно!</b>\n\n" f"<b>Правильный ответ:</b> {correct_answer}\n",
             parse_mode="HTML",
         )
 
-    data["current_question"] += 1
-    await state.update_data(data)
-    await show_next_question(message, state)
+    await show_next_question(message, state, session)
 
 
-async def finish_test(message: Message, state: FSMContext):
-    data = await state.get_data()
+async def finish_test(message: Message, state: FSMContext, session: AsyncSession):
+    test_session = await get_test_session(state)
     end_time = datetime.now()
 
-    if "start_time" not in data:
+    if test_session is None:
         await message.answer(
             "Тест завершен",
             reply_markup=ReplyKeyboardRemove(),
@@ -236,36 +235,28 @@ async def finish_test(message: Message, state: FSMContext):
         await state.clear()
         return
 
-    duration = end_time - data["start_time"]
-
-    async with async_session_maker() as session:
-        test_attempt = await session.get(TestAttempt, data["test_attempt_id"])
-        answers = await session.execute(
-            select(AttemptAnswer).where(
-                AttemptAnswer.test_attempt_id == test_attempt.id
-            )
-        )
-        answers = answers.scalars().all()
+    # Сессия больше не действительна для обработчиков, ожидающих ответа
+    test_session.version += 1
+    await state.clear()
 
-        correct_answers = sum(1 for answer in answers if answer.is_correct)
-        total_answers = len(answers)
+    duration = end_time - test_session.start_time
+    correct_answers, total_answers = test_session.score, test_session.answered
 
-        test_attempt.end_time = end_time
-        test_attempt.score = correct_answers
-        await session.commit()
+    await TestAttemptRepository(session).finish_attempt(
+        test_session.test_attempt_id, end_time, correct_answers
+    )
 
-        percentage = (correct_answers / total_answers * 100) if total_answers > 0 else 0
+    percentage = (correct_answers / total_answers * 100) if total_answers > 0 else 0
 
-        result_message = (
-            f"🏁 <b>Тест завершен!</b>\n\n"
-            f"⏳ <b>Время выполнения:</b> <i>{duration.seconds // 60} мин {duration.seconds % 60} сек</i>\n"
-            f"✅ <b>Правильных ответов:</b> <i>{correct_answers} из {total_answers}</i>\n"
-            f"📊 <b>Процент правильных ответов:</b> <i>{percentage:.1f}%</i>\n\n"
-            "Начать новый тест - /start_test."
-        )
+    result_message = (
+        f"🏁 <b>Тест завершен!</b>\n\n"
+        f"⏳ <b>Время выполнения:</b> <i>{duration.seconds // 60} мин {duration.seconds % 60} сек</i>\n"
+        f"✅ <b>Правильных ответов:</b> <i>{correct_answers} из {total_answers}</i>\n"
+        f"📊 <b>Процент правильных ответов:</b> <i>{percentage:.1f}%</i>\n\n"
+        "Начать новый тест - /start_test."
+    )
 
-        await message.answer(result_message, reply_markup=ReplyKeyboardRemove())
-        await state.clear()
+    await message.answer(result_message, reply_markup=ReplyKeyboardRemove())
 
 
 def register_test_handlers(dp: Dispatcher):
@@ -0,0 +1,159 @@
+from html import escape as html_escape
+
+from aiogram import Dispatcher, F, types
+from aiogram.filters import Command, CommandObject
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import write_queue
+from app.middlewares.ordering import user_ordering
+from app.repositories.test_attempts import TestAttemptRepository
+from app.services.duplicates import duplicate_index
+from app.services.question_bank import question_bank
+from app.services.sampler import question_sampler
+from app.services.send_scheduler import bulk_sends, send_scheduler
+from app.utils.messages import split_message
+
+# Вопросы с меньшим числом ответов не попадают в список самых сложных
+MIN_STATS_ATTEMPTS = 5
+HARDEST_QUESTIONS = 20
+
+
+async def broken_questions_handler(message: types.Message) -> None:
+    broken = await question_bank.broken()
+    if not broken:
+        await message.answer("✅ Некорректных вопросов нет.")
+        return
+
+    lines = [f"⚠️ <b>Некорректные вопросы ({len(broken)}):</b>\n"]
+    for question in sorted(broken, key=lambda question: question.id):
+        truncated_text = (
+            question.text if len(question.text) < 50 else question.text[:47] + "..."
+        )
+        lines.append(
+            f"└ <code>{question.id:03d}</code> • {html_escape(truncated_text)}"
+            f" — <i>{question.problem}</i>"
+        )
+
+    with bulk_sends():
+        for chunk in split_message(lines):
+            await message.answer(chunk, parse_mode="HTML")
+
+
+async def duplicates_handler(message: types.Message) -> None:
+    await question_bank.ensure_loaded()
+    clusters = duplicate_index.clusters()
+    if not clusters:
+        await message.answer("✅ Повторяющихся вопросов нет.")
+        return
+
+    lines = [f"🔁 <b>Группы повторяющихся вопросов ({len(clusters)}):</b>\n"]
+    for cluster in clusters:
+        records = await question_bank.get_many(cluster)
+        lines.append(f"<b>{html_escape(records[0].text[:100])}</b>")
+        lines.append(
+            "└ " + ", ".join(f"<code>{record.id:03d}</code>" for record in records)
+        )
+
+    with bulk_sends():
+        for chunk in split_message(lines):
+            await message.answer(chunk, parse_mode="HTML")
+
+
+async def question_stats_handler(
+    message: types.Message, command: CommandObject, session: AsyncSession
+) -> None:
+    if command.args:
+        if not command.args.strip().isdigit():
+            await message.answer("❌ Используйте /question_stats [id вопроса]")
+            return
+        await question_stat_details(message, int(command.args), session)
+        return
+
+    await question_bank.ensure_loaded()
+    hardest = question_sampler.hardest(HARDEST_QUESTIONS, MIN_STATS_ATTEMPTS)
+    if not hardest:
+        await message.answer(
+            f"📭 Нет вопросов хотя бы с {MIN_STATS_ATTEMPTS} ответами."
+        )
+        return
+
+    records = {
+        record.id: record
+        for record in await question_bank.get_many(
+            [question_id for question_id, _ in hardest]
+        )
+    }
+    lines = ["🧠 <b>Самые сложные вопросы:</b>\n"]
+    for question_id, stats in hardest:
+        record = records.get(question_id)
+        text = record.text if record is not None else ""
+        truncated_text = text if len(text) < 50 else text[:47] + "..."
+        lines.append(
+            f"└ <code>{question_id:03d}</code> • {html_escape(truncated_text)}"
+            f" — <i>{stats.difficulty:.0%} ошибок из {stats.attempts}</i>"
+        )
+
+    with bulk_sends():
+        for chunk in split_message(lines):
+            await message.answer(chunk, parse_mode="HTML")
+
+
+async def question_stat_details(
+    message: types.Message, question_id: int, session: AsyncSession
+) -> None:
+    question = await question_bank.get(question_id)
+    if question is None:
+        await message.answer(f"❌ Вопрос {question_id} не найден.")
+        return
+
+    stat = await TestAttemptRepository(session).get_question_stat(question_id)
+    if stat is None or not stat.attempts:
+        await message.answer(f"📭 На вопрос {question_id:03d} ещё не отвечали.")
+        return
+
+    wrong = stat.attempts - stat.correct_answers
+    await message.answer(
+        f"📊 <b>Вопрос <code>{question_id:03d}</code></b>\n"
+        f"{html_escape(question.text[:200])}\n\n"
+        f"└ Ответов: {stat.attempts}\n"
+        f"└ Верных: {stat.correct_answers}, неверных: {wrong} "
+        f"({wrong / stat.attempts:.0%})\n"
+        f"└ Последний ответ: {stat.last_seen_at:%d.%m.%Y %H:%M}",
+        parse_mode="HTML",
+    )
+
+
+async def stats_handler(message: types.Message) -> None:
+    writes = write_queue.stats()
+    updates = user_ordering.stats()
+    sends = send_scheduler.stats()
+    await message.answer(
+        "📈 <b>Состояние бота</b>\n\n"
+        "<b>Обновления:</b>\n"
+        f"└ В обработке: {updates.in_flight}, ждут своей очереди: {updates.waiting} "
+        f"(максимум {updates.max_waiting})\n"
+        f"└ Активных пользователей: {updates.active_users}, "
+        f"обработано: {updates.processed}\n\n"
+        "<b>Отправка сообщений:</b>\n"
+        f"└ Ждут лимита: {sends.queued}, отправлено: {sends.sent}\n"
+        f"└ Объединено: {sends.merged}, повторов после RetryAfter: {sends.retried}\n\n"
+        "<b>Очередь записи:</b>\n"
+        f"└ В очереди: {writes.depth}\n"
+        f"└ Транзакций: {writes.batches}, записей: {writes.jobs}, ошибок: {writes.failed}\n"
+        f"└ Коммит: последний {writes.last_commit_ms:.1f} мс, "
+        f"средний {writes.avg_commit_ms:.1f} мс, максимум {writes.max_commit_ms:.1f} мс",
+        parse_mode="HTML",
+    )
+
+
+def register_report_handlers(dp: Dispatcher) -> None:
+    is_admin = F.from_user.id.in_(settings.ADMINS)
+    dp.message.register(
+        broken_questions_handler, Command(commands=["broken_questions"]), is_admin
+    )
+    dp.message.register(duplicates_handler, Command(commands=["duplicates"]), is_admin)
+    dp.message.register(
+        question_stats_handler, Command(commands=["question_stats"]), is_admin
+    )
+    dp.message.register(stats_handler, Command(commands=["stats"]), is_admin)
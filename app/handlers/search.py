@@ -0,0 +1,111 @@
+from html import escape as html_escape
+
+from aiogram import Dispatcher, F, types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.questions import QuestionRepository
+from app.utils.text import fts_query
+
+SEARCH_RESULTS_PER_PAGE = 10
+
+
+async def render_search_page(
+    session: AsyncSession, query: str, page: int
+) -> tuple[str, InlineKeyboardMarkup | None] | None:
+    match = fts_query(query)
+    if match is None:
+        return None
+
+    # Лишняя строка показывает, есть ли следующая страница
+    questions = await QuestionRepository(session).search_questions(
+        match,
+        limit=SEARCH_RESULTS_PER_PAGE + 1,
+        offset=page * SEARCH_RESULTS_PER_PAGE,
+    )
+    has_next = len(questions) > SEARCH_RESULTS_PER_PAGE
+    questions = questions[:SEARCH_RESULTS_PER_PAGE]
+    if not questions:
+        return None
+
+    response_lines = [f"🔎 <b>Поиск:</b> {html_escape(query)}\n"]
+    for question_id, text in questions:
+        truncated_text = text if len(text) < 50 else text[:47] + "..."
+        response_lines.append(
+            f"└ <code>{question_id:03d}</code> • <i>{html_escape(truncated_text)}</i>"
+        )
+    response_lines.append(
+        f"\n📌 Страница {page + 1}. Ответ на вопрос: /solve_question &lt;id&gt;"
+    )
+
+    keyboard_buttons = []
+    if page > 0:
+        keyboard_buttons.append(
+            InlineKeyboardButton(
+                text="◀️ Назад", callback_data=f"search_page:{page - 1}"
+            )
+        )
+    if has_next:
+        keyboard_buttons.append(
+            InlineKeyboardButton(
+                text="Вперед ▶️", callback_data=f"search_page:{page + 1}"
+            )
+        )
+    keyboard = (
+        InlineKeyboardMarkup(inline_keyboard=[keyboard_buttons])
+        if keyboard_buttons
+        else None
+    )
+    return "\n".join(response_lines), keyboard
+
+
+async def search_handler(
+    message: types.Message,
+    command: CommandObject,
+    state: FSMContext,
+    session: AsyncSession,
+) -> None:
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer("Укажите слова для поиска. Например: /search калибр СВД")
+        return
+
+    rendered = await render_search_page(session, query, page=0)
+    if rendered is None:
+        await message.answer("🔎 Ничего не найдено.")
+        return
+
+    # Запрос не помещается в callback_data, поэтому хранится в состоянии
+    await state.update_data(search_query=query)
+    response, keyboard = rendered
+    await message.answer(response, reply_markup=keyboard, parse_mode="HTML")
+
+
+async def search_pagination(
+    callback_query: types.CallbackQuery, state: FSMContext, session: AsyncSession
+) -> None:
+    page = int(callback_query.data.split(":")[1])
+    query = (await state.get_data()).get("search_query")
+    rendered = await render_search_page(session, query, page) if query else None
+    if rendered is None:
+        await callback_query.answer("❌ Поиск устарел, повторите /search.")
+        return
+
+    response, keyboard = rendered
+    try:
+        await callback_query.message.edit_text(
+            response, reply_markup=keyboard, parse_mode="HTML"
+        )
+    except TelegramBadRequest as e:
+        # Повторное нажатие на ту же кнопку
+        if "message is not modified" not in str(e):
+            raise
+    await callback_query.answer()
+
+
+def register_search_handlers(dp: Dispatcher) -> None:
+    dp.message.register(search_handler, Command(commands=["search"]))
+    dp.callback_query.register(search_pagination, F.data.startswith("search_page:"))
@@ -0,0 +1,126 @@
+import io
+from html import escape as html_escape
+
+from aiogram import Bot, Dispatcher, F, types
+
+from app.handlers.fallback import fallback_handler
+from app.handlers.quiz import format_question_answer
+from app.logger_setup import get_logger
+from app.services.question_bank import QuestionRecord, question_bank
+from app.services.send_scheduler import bulk_sends
+from app.services.solver import question_solver
+from app.utils.messages import split_message
+from app.utils.parse_question import ParsedQuestion, parse_questions
+
+logger = get_logger(__name__)
+
+# Более короткий текст не похож на вопрос и уходит в справку
+MIN_QUERY_LENGTH = 10
+# Ограничения на один пакет вопросов
+MAX_BATCH_QUESTIONS = 300
+MAX_BATCH_FILE_SIZE = 1024 * 1024
+
+
+async def solve_text_handler(message: types.Message) -> None:
+    if len(message.text.strip()) < MIN_QUERY_LENGTH:
+        await fallback_handler(message)
+        return
+
+    blocks = list(parse_questions(message.text.splitlines(), require_answers=False))
+    if len(blocks) > 1:
+        await solve_batch(message, blocks)
+        return
+
+    await question_bank.ensure_loaded()
+    matches = question_solver.search(message.text)
+    question = await question_bank.get(matches[0].question_id) if matches else None
+    if question is None:
+        await message.answer(
+            "🤷 Похожий вопрос не найден. Попробуйте /search с ключевыми словами."
+        )
+        return
+
+    logger.info(
+        f"Пользователь {message.from_user.id} нашёл вопрос {question.id} "
+        f"по тексту, совпадение {matches[0].similarity:.0%}"
+    )
+    await message.answer(
+        f"🎯 Совпадение {matches[0].similarity:.0%}, вопрос "
+        f"<code>{question.id:03d}</code>\n\n{format_question_answer(question)}",
+        parse_mode="HTML",
+    )
+
+
+async def solve_file_handler(message: types.Message, bot: Bot) -> None:
+    if message.document.file_size and message.document.file_size > MAX_BATCH_FILE_SIZE:
+        await message.answer("❌ Файл больше 1 МБ, разделите его на части.")
+        return
+
+    buffer = await bot.download(message.document)
+    try:
+        with io.TextIOWrapper(buffer, encoding="utf-8-sig") as lines:
+            blocks = list(parse_questions(lines, require_answers=False))
+    except UnicodeDecodeError:
+        await message.answer("❌ Файл должен быть в кодировке UTF-8.")
+        return
+
+    if not blocks:
+        await message.answer("В файле нет вопросов.")
+        return
+    await solve_batch(message, blocks)
+
+
+async def solve_batch(message: types.Message, blocks: list[ParsedQuestion]) -> None:
+    if len(blocks) > MAX_BATCH_QUESTIONS:
+        await message.answer(
+            f"❌ За один раз можно прислать не больше {MAX_BATCH_QUESTIONS} "
+            f"вопросов, а здесь {len(blocks)}."
+        )
+        return
+
+    await question_bank.ensure_loaded()
+    matches = question_solver.solve_many(
+        " ".join([block.text, *(text for text, _ in block.options)]) for block in blocks
+    )
+    records = await question_bank.get_many(
+        [match.question_id for match in matches if match is not None]
+    )
+    questions = {record.id: record for record in records}
+
+    lines = []
+    found = 0
+    for number, (block, match) in enumerate(zip(blocks, matches), start=1):
+        question = questions.get(match.question_id) if match else None
+        truncated_text = block.text if len(block.text) < 60 else block.text[:57] + "..."
+        if question is None:
+            answer_line = "└ ❓ не найден"
+        else:
+            found += 1
+            answer_line = (
+                f"└ <b>{html_escape(format_short_answer(question))}</b> "
+                f"<i>({question.id:03d}, {match.similarity:.0%})</i>"
+            )
+        # Вопрос и ответ держатся вместе при разбиении на сообщения
+        lines.append(f"{number}. {html_escape(truncated_text)}\n{answer_line}")
+
+    logger.info(
+        f"Пользователь {message.from_user.id} решил пакет: "
+        f"найдено {found} из {len(blocks)}"
+    )
+    header = f"📝 <b>Ответы: найдено {found} из {len(blocks)}</b>\n"
+    with bulk_sends():
+        for chunk in split_message([header, *lines]):
+            await message.answer(chunk, parse_mode="HTML")
+
+
+def format_short_answer(question: QuestionRecord) -> str:
+    if question.has_options:
+        return "; ".join(
+            option.text.rstrip(";,. ") for option in question.correct_options
+        )
+    return question.answer or "не указан"
+
+
+def register_solver_handlers(dp: Dispatcher) -> None:
+    dp.message.register(solve_text_handler, F.text, ~F.text.startswith("/"))
+    dp.message.register(solve_file_handler, F.document.file_name.endswith(".txt"))
@@ -1,6 +1,7 @@
 from aiogram import html
 from aiogram.filters import CommandStart
 from aiogram.types import Message
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.errors import UserNotFoundException
 from app.logger_setup import get_logger
@@ -10,9 +11,9 @@ from app.schemas.users import UserCreate
 logger = get_logger(__name__)
 
 
-async def command_start_handler(message: Message) -> None:
+async def command_start_handler(message: Message, session: AsyncSession) -> None:
     logger.info(f"Received /start command from {message.from_user.full_name}")
-    user_repository = UserRepository()
+    user_repository = UserRepository(session)
     try:
         user = await user_repository.get_user_by_telegram_id(message.from_user.id)
         logger.info(f"User {message.from_user.full_name} already exists.")
@@ -0,0 +1,16 @@
+from aiogram import Dispatcher
+
+from app.config import settings
+from app.database import read_session_maker
+from app.middlewares.concurrency import ConcurrencyLimitMiddleware
+from app.middlewares.database import DatabaseSessionMiddleware
+from app.middlewares.ordering import user_ordering
+
+
+def register_all_middlewares(dp: Dispatcher) -> None:
+    # Очередь пользователя ждём до семафора, чтобы не занимать его слоты
+    dp.update.outer_middleware(user_ordering)
+    dp.update.outer_middleware(
+        ConcurrencyLimitMiddleware(settings.MAX_CONCURRENT_UPDATES)
+    )
+    dp.update.outer_middleware(DatabaseSessionMiddleware(read_session_maker))
@@ -0,0 +1,63 @@
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import TelegramObject
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.database import release_update_session, update_session
+
+
+class DatabaseSessionMiddleware(BaseMiddleware):
+    """
+    Gives every update a single session, injected into handlers as `session`
+    and used by all reads made while handling it.
+
+    AsyncSession checks out a connection only on its first query, so updates
+    that never touch the database cost nothing. Reads between two Telegram
+    requests share one transaction; ReadSessionReleaseMiddleware ends it
+    before each request, and anything left open is committed once the
+    handler returns.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        self._session_maker = session_maker
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        async with self._session_maker() as session:
+            token = update_session.set(session)
+            try:
+                data["session"] = session
+                result = await handler(event, data)
+                if session.in_transaction():
+                    await session.commit()
+                return result
+            finally:
+                update_session.reset(token)
+
+
+class ReadSessionReleaseMiddleware(BaseRequestMiddleware):
+    """
+    Bot session middleware that returns the update's read connection to the
+    pool before every Telegram request, so it is not held while the request
+    waits for the rate limits and the network.
+    """
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> TelegramType:
+        await release_update_session()
+        return await make_request(bot, method)
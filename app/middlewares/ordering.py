@@ -0,0 +1,111 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+from aiogram.types import Chat, TelegramObject, User
+
+
+@dataclass
+class UpdateOrderingStats:
+    """
+    Snapshot of the per-user ordering metrics.
+
+    Attributes:
+        in_flight (int): Updates being handled right now.
+        waiting (int): Updates queued behind an earlier update of the same user.
+        max_waiting (int): Largest number of queued updates seen so far.
+        active_users (int): Users with an update in flight or queued.
+        processed (int): Updates handled so far.
+    """
+
+    in_flight: int
+    waiting: int
+    max_waiting: int
+    active_users: int
+    processed: int
+
+
+class _KeyedLock:
+    __slots__ = ("lock", "holders")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.holders = 0
+
+
+class UserOrderingMiddleware(BaseMiddleware):
+    """
+    Serializes updates of the same user while different users run concurrently.
+
+    Updates are keyed by the sender, or by the chat when there is none, and
+    wait on a per-key FIFO lock. A lock lives only while some update of its key
+    is in flight or queued, so memory follows the number of active users.
+    """
+
+    def __init__(self) -> None:
+        self._locks: dict[int, _KeyedLock] = {}
+        self._in_flight = 0
+        self._waiting = 0
+        self._max_waiting = 0
+        self._processed = 0
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user: User | None = data.get("event_from_user")
+        chat: Chat | None = data.get("event_chat")
+        key = user.id if user else chat.id if chat else None
+        if key is None:
+            return await self._handle(handler, event, data)
+
+        keyed = self._locks.get(key)
+        if keyed is None:
+            keyed = self._locks[key] = _KeyedLock()
+        keyed.holders += 1
+        try:
+            if keyed.lock.locked():
+                self._waiting += 1
+                self._max_waiting = max(self._max_waiting, self._waiting)
+                try:
+                    await keyed.lock.acquire()
+                finally:
+                    self._waiting -= 1
+            else:
+                await keyed.lock.acquire()
+            try:
+                return await self._handle(handler, event, data)
+            finally:
+                keyed.lock.release()
+        finally:
+            keyed.holders -= 1
+            if keyed.holders == 0:
+                del self._locks[key]
+
+    def stats(self) -> UpdateOrderingStats:
+        return UpdateOrderingStats(
+            in_flight=self._in_flight,
+            waiting=self._waiting,
+            max_waiting=self._max_waiting,
+            active_users=len(self._locks),
+            processed=self._processed,
+        )
+
+    async def _handle(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        self._in_flight += 1
+        try:
+            return await handler(event, data)
+        finally:
+            self._in_flight -= 1
+            self._processed += 1
+
+
+user_ordering = UserOrderingMiddleware()
@@ -2,12 +2,18 @@ __all__ = [
     "Option",
     "AttemptAnswer",
     "Question",
+    "QuestionStat",
     "TestAttempt",
     "User",
+    "UserStat",
+    "questions_fts",
 ]
 
 from .options import Option
 from .attempt_answers import AttemptAnswer
 from .questions import Question
+from .question_stats import QuestionStat
 from .test_attempts import TestAttempt
 from .users import User
+from .user_stats import UserStat
+from .search import questions_fts
@@ -6,10 +6,10 @@ from app.database import Base
 
 class AttemptAnswer(Base):
     test_attempt_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("testattempts.id"), nullable=False
+        Integer, ForeignKey("testattempts.id"), nullable=False, index=True
     )
     question_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("questions.id"), nullable=False
+        Integer, ForeignKey("questions.id"), nullable=False, index=True
     )
     is_correct: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
 
@@ -6,7 +6,7 @@ from app.database import Base
 
 class Option(Base):
     question_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("questions.id"), nullable=False
+        Integer, ForeignKey("questions.id"), nullable=False, index=True
     )
     option_text: Mapped[str] = mapped_column(Text, nullable=False)
     is_correct: Mapped[bool] = mapped_column(Boolean, default=False)
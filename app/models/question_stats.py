@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class QuestionStat(Base):
+    # Счётчики ответов на вопрос, обновляются вместе с каждым ответом,
+    # чтобы сложность не считалась по всей истории попыток
+    question_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("questions.id"), unique=True, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    correct_answers: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_seen_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
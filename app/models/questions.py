@@ -1,10 +1,22 @@
-from sqlalchemy import Text, Boolean, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import Text, Boolean, ForeignKey, String, DateTime, Index, text
 from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 from app.database import Base
 
 
 class Question(Base):
+    # Живые вопросы не повторяются с точностью до нормализации текста
+    __table_args__ = (
+        Index(
+            "uq_questions_text_hash",
+            "text_hash",
+            unique=True,
+            sqlite_where=text("deleted_at IS NULL AND text_hash IS NOT NULL"),
+        ),
+    )
+
     text: Mapped[str] = mapped_column(Text, nullable=False)
     has_options: Mapped[bool] = mapped_column(Boolean, default=False)
     answer_text: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -12,6 +24,11 @@ class Question(Base):
     created_by: Mapped[int | None] = mapped_column(
         ForeignKey("users.id"), nullable=True
     )
+    content_hash: Mapped[str | None] = mapped_column(
+        String(32), nullable=True, index=True
+    )
+    text_hash: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    deleted_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
     created_by_user = relationship("User", back_populates="questions", overlaps="user")
     user = relationship("User", back_populates="questions", overlaps="created_by_user")
@@ -0,0 +1,135 @@
+from sqlalchemy import DDL, column, event, table
+
+from app.database import Base
+
+
+def _fold(expression: str) -> str:
+    # unicode61 снимает диакритику только с латиницы, поэтому ё заменяется
+    # на е ещё при записи в индекс
+    return f"replace(replace({expression}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _options_of(question_id: str) -> str:
+    return (
+        f"SELECT coalesce({_fold('group_concat(option_text, char(10))')}, '') "
+        f"FROM options WHERE question_id = {question_id}"
+    )
+
+
+# Полнотекстовый индекс живых вопросов: rowid совпадает с id вопроса,
+# варианты ответа собраны в одну колонку. Триггеры держат его в актуальном
+# состоянии при одиночных записях в questions и options
+QUESTIONS_FTS_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+        text, options, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+"""
+
+# Пока в таблице есть строка, триггеры не трогают индекс: массовая запись
+# сама пересобирает строки затронутых вопросов до конца своей транзакции
+QUESTIONS_FTS_BULK_TABLE = """
+    CREATE TABLE IF NOT EXISTS questions_fts_bulk (id INTEGER PRIMARY KEY)
+"""
+
+QUESTIONS_FTS_TRIGGERS = (
+    "questions_fts_insert",
+    "questions_fts_update",
+    "questions_fts_delete",
+    "options_fts_insert",
+    "options_fts_update",
+    "options_fts_delete",
+)
+
+
+def questions_fts_triggers(deferrable: bool = True) -> tuple[str, ...]:
+    """
+    Definitions of QUESTIONS_FTS_TRIGGERS. Deferrable triggers do nothing
+    while questions_fts_bulk has a row.
+    """
+    idle = "NOT EXISTS (SELECT 1 FROM questions_fts_bulk)" if deferrable else "1"
+    return (
+        f"""
+        CREATE TRIGGER IF NOT EXISTS questions_fts_insert
+        AFTER INSERT ON questions WHEN new.deleted_at IS NULL AND {idle} BEGIN
+            INSERT INTO questions_fts (rowid, text, options)
+            VALUES (new.id, {_fold("new.text")}, '');
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS questions_fts_update
+        AFTER UPDATE OF text, deleted_at ON questions WHEN {idle} BEGIN
+            DELETE FROM questions_fts WHERE rowid = old.id;
+            INSERT INTO questions_fts (rowid, text, options)
+            SELECT new.id, {_fold("new.text")}, ({_options_of("new.id")})
+            WHERE new.deleted_at IS NULL;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS questions_fts_delete
+        AFTER DELETE ON questions WHEN {idle} BEGIN
+            DELETE FROM questions_fts WHERE rowid = old.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS options_fts_insert
+        AFTER INSERT ON options WHEN {idle} BEGIN
+            UPDATE questions_fts
+            SET options = ltrim(
+                options || char(10) || {_fold("new.option_text")}, char(10)
+            )
+            WHERE rowid = new.question_id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS options_fts_update
+        AFTER UPDATE OF option_text, question_id ON options WHEN {idle} BEGIN
+            UPDATE questions_fts SET options = ({_options_of("questions_fts.rowid")})
+            WHERE rowid IN (old.question_id, new.question_id);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS options_fts_delete
+        AFTER DELETE ON options WHEN {idle} BEGIN
+            UPDATE questions_fts SET options = ({_options_of("old.question_id")})
+            WHERE rowid = old.question_id;
+        END
+        """,
+    )
+
+
+QUESTIONS_FTS_DDL = (
+    QUESTIONS_FTS_TABLE,
+    QUESTIONS_FTS_BULK_TABLE,
+    *questions_fts_triggers(),
+)
+
+QUESTIONS_FTS_BACKFILL = f"""
+    INSERT INTO questions_fts (rowid, text, options)
+    SELECT questions.id, {_fold("questions.text")}, ({_options_of("questions.id")})
+    FROM questions
+    WHERE questions.deleted_at IS NULL
+"""
+
+# Строки вопросов с данными id собираются одним запросом, а не триггерами
+QUESTIONS_FTS_REINDEX = f"""
+    INSERT INTO questions_fts (rowid, text, options)
+    SELECT questions.id, {_fold("questions.text")},
+        coalesce({_fold("group_concat(options.option_text, char(10))")}, '')
+    FROM questions LEFT JOIN options ON options.question_id = questions.id
+    WHERE questions.id IN :question_ids AND questions.deleted_at IS NULL
+    GROUP BY questions.id
+"""
+
+questions_fts = table(
+    "questions_fts",
+    column("rowid"),
+    column("text"),
+    column("options"),
+    column("rank"),
+)
+questions_fts_bulk = table("questions_fts_bulk", column("id"))
+
+# Схема в миграциях создаётся теми же командами; create_all нужен для тестов
+# и проверки планов запросов
+for statement in QUESTIONS_FTS_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement))
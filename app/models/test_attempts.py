@@ -1,12 +1,14 @@
 from datetime import datetime
 
-from sqlalchemy import ForeignKey, Integer, DateTime, func
+from sqlalchemy import ForeignKey, Index, Integer, DateTime, func
 from sqlalchemy.orm import Mapped, relationship, mapped_column
 
 from app.database import Base
 
 
 class TestAttempt(Base):
+    __table_args__ = (Index("ix_testattempts_user_id_end_time", "user_id", "end_time"),)
+
     user_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("users.id"), nullable=False
     )
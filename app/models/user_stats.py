@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class UserStat(Base):
+    # Сводка по завершённым тестам пользователя, обновляется при каждом
+    # завершении теста, чтобы история не пересчитывала все попытки
+    user_id: Mapped[int] = mapped_column(Integer, unique=True, nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    correct_answers: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_questions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    percent_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    best_percent: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    last_attempt_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    @property
+    def average_percent(self) -> float:
+        return self.percent_sum / self.attempts if self.attempts else 0.0
@@ -0,0 +1,27 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import read_session
+
+
+class BaseRepository:
+    """
+    Base class for repositories.
+
+    Reads use the given session, else the session of the current update,
+    else a short-lived read-only session; writes always go through the write
+    queue.
+    """
+
+    def __init__(self, session: AsyncSession | None = None) -> None:
+        self.session = session
+
+    @asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        if self.session is not None:
+            yield self.session
+            return
+        async with read_session() as session:
+            yield session
@@ -1,51 +1,410 @@
 import asyncio
+from typing import Collection
 
-from sqlalchemy import select, delete
+from sqlalchemy import (
+    bindparam,
+    select,
+    delete,
+    func,
+    insert,
+    literal_column,
+    text,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
 
-from app.database import async_session_maker
-from app.models import Question, Option
+from app.database import write_queue
+from app.models import Question, Option, questions_fts
+from app.models.search import QUESTIONS_FTS_REINDEX, questions_fts_bulk
+from app.repositories.base import BaseRepository
 from app.schemas.options import OptionCreate
 from app.schemas.questions import QuestionCreate
+from app.services.question_bank import OptionRecord, QuestionRecord, question_bank
+from app.utils.text import text_hash
 
+# Ограничение на число параметров в одном запросе с IN
+IN_CLAUSE_CHUNK = 500
 
-class QuestionRepository:
+
+class QuestionRepository(BaseRepository):
     async def create_question(self, question_schema: QuestionCreate) -> Question:
-        async with async_session_maker() as session:
-            question = Question(**question_schema.model_dump())
+        async def job(session: AsyncSession) -> Question:
+            question = Question(**_question_row(question_schema))
             session.add(question)
-            await session.commit()
+            await session.flush()
             return question
 
+        question = await write_queue.submit(job)
+        question_bank.put(QuestionRecord.from_model(question, options=[]))
+        return question
+
     async def create_question_with_options(
         self,
         question_schema: QuestionCreate,
         option_schemes: list[OptionCreate],
     ) -> Question:
-        async with async_session_maker() as session:
-            question = Question(**question_schema.model_dump())
+        async def job(session: AsyncSession) -> tuple[Question, list[Option]]:
+            question = Question(**_question_row(question_schema))
             session.add(question)
             await session.flush()
 
-            for option_schema in option_schemes:
-                option = Option(**option_schema.model_dump())
-                session.add(option)
+            options = [
+                Option(
+                    **option_schema.model_dump(exclude={"question_id"}),
+                    question_id=question.id,
+                )
+                for option_schema in option_schemes
+            ]
+            session.add_all(options)
+            await session.flush()
+            return question, options
 
-            await session.commit()
-            return question
+        question, options = await write_queue.submit(job)
+        question_bank.put(QuestionRecord.from_model(question, options=options))
+        return question
 
-    async def get_questions(self) -> list[Question]:
-        async with async_session_maker() as session:
-            query = select(Question)
-            result = await session.execute(query)
-            questions = result.scalars().all()
-            return questions
+    async def bulk_create_questions(
+        self, questions: list[tuple[QuestionCreate, list[OptionCreate]]]
+    ) -> list[QuestionRecord]:
+        """
+        Inserts questions with their options as two executemany statements in
+        one transaction and returns the created records. The full-text index
+        is filled once per question after all options are written.
+        """
+
+        async def job(session: AsyncSession) -> list[QuestionRecord]:
+            await _pause_fts(session)
+            question_ids = await _insert_questions(
+                session,
+                [_question_row(question_schema) for question_schema, _ in questions],
+            )
+            records = await _insert_options(
+                session,
+                [
+                    (question_id, question_schema, option_schemes)
+                    for question_id, (question_schema, option_schemes) in zip(
+                        question_ids, questions
+                    )
+                ],
+            )
+            await _resume_fts(session, question_ids)
+            return records
+
+        records = await write_queue.submit(job)
+        for record in records:
+            question_bank.put(record)
+        return records
+
+    async def get_content_hashes(self) -> dict[str, int]:
+        """
+        Maps content hashes of live questions to their ids.
+        """
+        async with self.read_session() as session:
+            result = await session.execute(
+                select(Question.content_hash, Question.id).where(
+                    Question.deleted_at.is_(None), Question.content_hash.is_not(None)
+                )
+            )
+            return dict(result.tuples().all())
+
+    async def get_by_text_hashes(self, text_hashes: Collection[str]) -> dict[str, int]:
+        """
+        Maps each of the given normalized text hashes to the id of the live
+        question that has it.
+        """
+        found: dict[str, int] = {}
+        text_hashes = list(text_hashes)
+        async with self.read_session() as session:
+            for start in range(0, len(text_hashes), IN_CLAUSE_CHUNK):
+                result = await session.execute(
+                    live_text_hashes_query(text_hashes[start : start + IN_CLAUSE_CHUNK])
+                )
+                found.update(result.tuples().all())
+        return found
+
+    async def apply_sync(
+        self,
+        inserts: list[tuple[QuestionCreate, list[OptionCreate]]],
+        updates: list[tuple[int, QuestionCreate, list[OptionCreate]]],
+        delete_ids: list[int],
+    ) -> list[QuestionRecord]:
+        """
+        Applies a sync diff in one transaction: inserts new questions, rewrites
+        updated ones together with their options and soft-deletes the rest. Returns the
+        records of inserted and updated questions.
+        """
+
+        async def job(session: AsyncSession) -> list[QuestionRecord]:
+            await _pause_fts(session)
+            update_ids = [question_id for question_id, _, _ in updates]
+            for start in range(0, len(update_ids), IN_CLAUSE_CHUNK):
+                await session.execute(
+                    delete(Option).where(
+                        Option.question_id.in_(
+                            update_ids[start : start + IN_CLAUSE_CHUNK]
+                        )
+                    )
+                )
+            if updates:
+                await session.execute(
+                    update(Question.__table__).where(
+                        Question.__table__.c.id == bindparam("question_id")
+                    ),
+                    [
+                        {
+                            "question_id": question_id,
+                            **_question_row(question_schema, exclude={"created_by"}),
+                        }
+                        for question_id, question_schema, _ in updates
+                    ],
+                )
+
+            for start in range(0, len(delete_ids), IN_CLAUSE_CHUNK):
+                await session.execute(
+                    update(Question)
+                    .where(Question.id.in_(delete_ids[start : start + IN_CLAUSE_CHUNK]))
+                    .values(deleted_at=func.now())
+                )
+
+            question_ids = []
+            if inserts:
+                question_ids = await _insert_questions(
+                    session,
+                    [_question_row(question_schema) for question_schema, _ in inserts],
+                )
+            records = await _insert_options(
+                session,
+                updates
+                + [
+                    (question_id, question_schema, option_schemes)
+                    for question_id, (question_schema, option_schemes) in zip(
+                        question_ids, inserts
+                    )
+                ],
+            )
+            await _resume_fts(session, update_ids + delete_ids + question_ids)
+            return records
+
+        records = await write_queue.submit(job)
+        for question_id in delete_ids:
+            question_bank.discard(question_id)
+        for record in records:
+            question_bank.put(record)
+        return records
+
+    async def get_question_page(
+        self,
+        limit: int,
+        after_id: int | None = None,
+        before_id: int | None = None,
+        preview_length: int = 50,
+    ) -> list[tuple[int, str]]:
+        """
+        Returns (id, text prefix) pairs of a page ordered by id. The page
+        starts after after_id or ends before before_id, so the query walks the
+        primary key and costs the same on any page.
+        """
+        async with self.read_session() as session:
+            result = await session.execute(
+                question_page_query(limit, after_id, before_id, preview_length)
+            )
+            rows = [tuple(row) for row in result.all()]
+            if before_id is not None:
+                rows.reverse()
+            return rows
+
+    async def search_questions(
+        self, match: str, limit: int, offset: int = 0, preview_length: int = 50
+    ) -> list[tuple[int, str]]:
+        """
+        Returns (id, text prefix) pairs of live questions matching an FTS5
+        expression, best matches first. Matches in the question text weigh
+        twice as much as matches in its options.
+        """
+        async with self.read_session() as session:
+            result = await session.execute(
+                search_query(match, limit, offset, preview_length)
+            )
+            return [tuple(row) for row in result.all()]
 
     async def delete_question(self, question_id: int) -> bool:
-        async with async_session_maker() as session:
-            query = delete(Question).where(Question.id == question_id)
+        async def job(session: AsyncSession) -> int:
+            query = (
+                update(Question)
+                .where(Question.id == question_id, Question.deleted_at.is_(None))
+                .values(deleted_at=func.now())
+            )
             result = await session.execute(query)
-            await session.commit()
-            return result.rowcount > 0
+            return result.rowcount
+
+        deleted = await write_queue.submit(job)
+        question_bank.discard(question_id)
+        return deleted > 0
+
+
+def live_text_hashes_query(text_hashes: Collection[str]) -> Select:
+    """
+    (text hash, id) pairs of live questions with the given text hashes.
+    """
+    return select(Question.text_hash, Question.id).where(
+        Question.deleted_at.is_(None), Question.text_hash.in_(text_hashes)
+    )
+
+
+def question_page_query(
+    limit: int,
+    after_id: int | None = None,
+    before_id: int | None = None,
+    preview_length: int = 50,
+) -> Select:
+    """
+    Page of (id, text prefix) pairs of live questions; see get_question_page.
+    A page before before_id comes in descending order.
+    """
+    query = select(Question.id, func.substr(Question.text, 1, preview_length)).where(
+        Question.deleted_at.is_(None)
+    )
+    if before_id is not None:
+        return (
+            query.where(Question.id < before_id)
+            .order_by(Question.id.desc())
+            .limit(limit)
+        )
+    if after_id is not None:
+        query = query.where(Question.id > after_id)
+    return query.order_by(Question.id).limit(limit)
+
+
+def search_query(
+    match: str, limit: int, offset: int = 0, preview_length: int = 50
+) -> Select:
+    """
+    Page of (id, text prefix) pairs of questions matching an FTS5
+    expression; see search_questions.
+    """
+    fts = literal_column(questions_fts.name)
+    # Веса колонок задаются через rank, тогда FTS5 сортирует результаты сам,
+    # без временного b-дерева
+    return (
+        select(Question.id, func.substr(Question.text, 1, preview_length))
+        .select_from(questions_fts)
+        .join(Question, Question.id == questions_fts.c.rowid)
+        .where(
+            fts.op("MATCH")(match),
+            questions_fts.c.rank.op("MATCH")("bm25(2.0, 1.0)"),
+        )
+        .order_by(questions_fts.c.rank)
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+def _question_row(
+    question_schema: QuestionCreate, exclude: set[str] | None = None
+) -> dict:
+    return {
+        **question_schema.model_dump(exclude=exclude),
+        "text_hash": text_hash(question_schema.text),
+    }
+
+
+async def _pause_fts(session: AsyncSession) -> None:
+    """
+    Stops the full-text triggers until _resume_fts() in the same transaction.
+    """
+    await session.execute(insert(questions_fts_bulk).values(id=1))
+
+
+async def _resume_fts(session: AsyncSession, question_ids: list[int]) -> None:
+    """
+    Rewrites the full-text rows of the given questions and turns the
+    triggers back on.
+    """
+    reindex = text(QUESTIONS_FTS_REINDEX).bindparams(
+        bindparam("question_ids", expanding=True)
+    )
+    for start in range(0, len(question_ids), IN_CLAUSE_CHUNK):
+        chunk = question_ids[start : start + IN_CLAUSE_CHUNK]
+        await session.execute(
+            delete(questions_fts).where(questions_fts.c.rowid.in_(chunk))
+        )
+        await session.execute(reindex, {"question_ids": chunk})
+    await session.execute(delete(questions_fts_bulk))
+
+
+async def _insert_questions(session: AsyncSession, rows: list[dict]) -> list[int]:
+    """
+    Inserts question rows with one executemany call and returns their ids in
+    the order of rows.
+    """
+    await session.execute(insert(Question.__table__), rows)
+    # Живой вопрос с данным нормализованным текстом единственный, так что
+    # по хешам текста id находятся однозначно
+    text_hashes = [row["text_hash"] for row in rows]
+    ids: dict[str, int] = {}
+    for start in range(0, len(text_hashes), IN_CLAUSE_CHUNK):
+        result = await session.execute(
+            live_text_hashes_query(text_hashes[start : start + IN_CLAUSE_CHUNK])
+        )
+        ids.update(result.tuples().all())
+    return [ids[question_hash] for question_hash in text_hashes]
+
+
+async def _insert_options(
+    session: AsyncSession,
+    questions: list[tuple[int, QuestionCreate, list[OptionCreate]]],
+) -> list[QuestionRecord]:
+    """
+    Inserts options of saved questions that have none yet and returns the
+    complete records.
+    """
+    option_rows = [
+        {
+            **option_schema.model_dump(exclude={"question_id"}),
+            "question_id": question_id,
+        }
+        for question_id, _, option_schemes in questions
+        for option_schema in option_schemes
+    ]
+    option_ids: dict[int, list[int]] = {}
+    if option_rows:
+        await session.execute(insert(Option.__table__), option_rows)
+        # Id растут в порядке вставки, поэтому варианты одного вопроса,
+        # упорядоченные по id, идут в порядке option_schemes
+        question_ids = [question_id for question_id, _, _ in questions]
+        for start in range(0, len(question_ids), IN_CLAUSE_CHUNK):
+            result = await session.execute(
+                select(Option.question_id, Option.id)
+                .where(
+                    Option.question_id.in_(
+                        question_ids[start : start + IN_CLAUSE_CHUNK]
+                    )
+                )
+                .order_by(Option.question_id, Option.id)
+            )
+            for question_id, option_id in result.tuples():
+                option_ids.setdefault(question_id, []).append(option_id)
+
+    return [
+        QuestionRecord(
+            id=question_id,
+            text=question_schema.text,
+            has_options=question_schema.has_options,
+            answer_text=question_schema.answer_text,
+            options=tuple(
+                OptionRecord(
+                    id=option_id,
+                    text=option_schema.option_text,
+                    is_correct=option_schema.is_correct,
+                )
+                for option_id, option_schema in zip(
+                    option_ids.get(question_id, ()), option_schemes
+                )
+            ),
+        ).classified()
+        for question_id, question_schema, option_schemes in questions
+    ]
 
 
 async def main():
@@ -0,0 +1,189 @@
+from datetime import datetime
+
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.database import write_queue
+from app.models import AttemptAnswer, QuestionStat, TestAttempt, UserStat
+from app.repositories.base import BaseRepository
+from app.services.sampler import question_sampler
+
+
+class TestAttemptRepository(BaseRepository):
+    async def create_attempt(self, user_id: int, total_questions: int) -> TestAttempt:
+        async def job(session: AsyncSession) -> TestAttempt:
+            test_attempt = TestAttempt(user_id=user_id, total_questions=total_questions)
+            session.add(test_attempt)
+            await session.flush()
+            return test_attempt
+
+        return await write_queue.submit(job)
+
+    async def add_answer(
+        self, test_attempt_id: int, question_id: int, is_correct: bool
+    ) -> None:
+        async def job(session: AsyncSession) -> None:
+            session.add(
+                AttemptAnswer(
+                    test_attempt_id=test_attempt_id,
+                    question_id=question_id,
+                    is_correct=is_correct,
+                )
+            )
+            # Счётчики вопроса обновляются в той же транзакции, что и ответ
+            await session.execute(
+                insert(QuestionStat)
+                .values(
+                    question_id=question_id,
+                    attempts=1,
+                    correct_answers=int(is_correct),
+                    last_seen_at=func.now(),
+                )
+                .on_conflict_do_update(
+                    index_elements=[QuestionStat.question_id],
+                    set_={
+                        "attempts": QuestionStat.attempts + 1,
+                        "correct_answers": QuestionStat.correct_answers
+                        + int(is_correct),
+                        "last_seen_at": func.now(),
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+
+        await write_queue.submit(job)
+        question_sampler.record_answer(question_id, is_correct)
+
+    async def finish_attempt(
+        self, test_attempt_id: int, end_time: datetime, score: int
+    ) -> None:
+        async def job(session: AsyncSession) -> None:
+            result = await session.execute(
+                update(TestAttempt)
+                .where(
+                    TestAttempt.id == test_attempt_id, TestAttempt.end_time.is_(None)
+                )
+                .values(end_time=end_time, score=score)
+                .returning(TestAttempt.user_id, TestAttempt.total_questions)
+            )
+            row = result.first()
+            if row is None:
+                return
+            user_id, total_questions = row
+            percent = score / total_questions * 100 if total_questions else 0.0
+
+            # Сводка обновляется в той же транзакции, что и сама попытка
+            await session.execute(
+                insert(UserStat)
+                .values(
+                    user_id=user_id,
+                    attempts=1,
+                    correct_answers=score,
+                    total_questions=total_questions,
+                    percent_sum=percent,
+                    best_percent=percent,
+                    last_attempt_at=end_time,
+                )
+                .on_conflict_do_update(
+                    index_elements=[UserStat.user_id],
+                    set_={
+                        "attempts": UserStat.attempts + 1,
+                        "correct_answers": UserStat.correct_answers + score,
+                        "total_questions": UserStat.total_questions + total_questions,
+                        "percent_sum": UserStat.percent_sum + percent,
+                        "best_percent": func.max(UserStat.best_percent, percent),
+                        "last_attempt_at": end_time,
+                        "updated_at": func.now(),
+                    },
+                )
+            )
+
+        await write_queue.submit(job)
+
+    async def get_user_stat(self, user_id: int) -> UserStat | None:
+        async with self.read_session() as session:
+            result = await session.execute(user_stat_query(user_id))
+            return result.scalar_one_or_none()
+
+    async def get_question_stat(self, question_id: int) -> QuestionStat | None:
+        async with self.read_session() as session:
+            result = await session.execute(question_stat_query(question_id))
+            return result.scalar_one_or_none()
+
+    async def get_question_stats(self) -> list[tuple[int, int, int]]:
+        """
+        Returns (question_id, attempts, correct) counters of every answered
+        question.
+        """
+        async with self.read_session() as session:
+            result = await session.execute(
+                select(
+                    QuestionStat.question_id,
+                    QuestionStat.attempts,
+                    QuestionStat.correct_answers,
+                )
+            )
+            return [tuple(row) for row in result.all()]
+
+    async def get_history_page(
+        self,
+        user_id: int,
+        limit: int,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> list[TestAttempt]:
+        """
+        Returns a page of finished attempts, newest first. The page starts
+        after the attempt after_id or ends before before_id; attempts are
+        ordered by (end_time, id), so the query walks the
+        (user_id, end_time) index on any page.
+        """
+        async with self.read_session() as session:
+            result = await session.execute(
+                history_page_query(user_id, limit, after_id, before_id)
+            )
+            attempts = list(result.scalars().all())
+            if before_id is not None:
+                attempts.reverse()
+            return attempts
+
+
+def user_stat_query(user_id: int) -> Select:
+    return select(UserStat).where(UserStat.user_id == user_id)
+
+
+def question_stat_query(question_id: int) -> Select:
+    return select(QuestionStat).where(QuestionStat.question_id == question_id)
+
+
+def history_page_query(
+    user_id: int,
+    limit: int,
+    after_id: int | None = None,
+    before_id: int | None = None,
+) -> Select:
+    """
+    Page of finished attempts; see get_history_page. A page before
+    before_id comes oldest first.
+    """
+    anchor_id = after_id if after_id is not None else before_id
+    query = select(TestAttempt).where(
+        TestAttempt.user_id == user_id, TestAttempt.end_time.is_not(None)
+    )
+    key = tuple_(TestAttempt.end_time, TestAttempt.id)
+    if anchor_id is not None:
+        anchor = tuple_(
+            select(TestAttempt.end_time)
+            .where(TestAttempt.id == anchor_id)
+            .scalar_subquery(),
+            anchor_id,
+        )
+        query = query.where(key < anchor if after_id is not None else key > anchor)
+
+    if before_id is not None:
+        query = query.order_by(TestAttempt.end_time, TestAttempt.id)
+    else:
+        query = query.order_by(TestAttempt.end_time.desc(), TestAttempt.id.desc())
+    return query.limit(limit)
@@ -1,18 +1,20 @@
 import asyncio
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
 
-from app.database import async_session_maker
+from app.database import write_queue
 from app.errors import UserNotFoundException
 from app.models import User
+from app.repositories.base import BaseRepository
 from app.schemas.users import UserCreate
 
 
-class UserRepository:
+class UserRepository(BaseRepository):
     async def get_user_by_telegram_id(self, telegram_id: int) -> User:
-        async with async_session_maker() as session:
-            query = select(User).where(User.telegram_id == telegram_id)
-            result = await session.execute(query)
+        async with self.read_session() as session:
+            result = await session.execute(user_by_telegram_id_query(telegram_id))
             user = result.scalar_one_or_none()
             if not user:
                 raise UserNotFoundException(
@@ -21,12 +23,18 @@ class UserRepository:
             return user
 
     async def create_user(self, user_schema: UserCreate) -> User:
-        async with async_session_maker() as session:
+        async def job(session: AsyncSession) -> User:
             user = User(**user_schema.model_dump())
             session.add(user)
-            await session.commit()
+            await session.flush()
             return user
 
+        return await write_queue.submit(job)
+
+
+def user_by_telegram_id_query(telegram_id: int) -> Select:
+    return select(User).where(User.telegram_id == telegram_id)
+
 
 async def main():
     # Test create_user
@@ -14,3 +14,4 @@ class QuestionCreate(BaseModel):
     has_options: bool = False
     answer_text: str | None = None
     created_by: int | None = None
+    content_hash: str | None = None
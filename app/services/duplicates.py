@@ -0,0 +1,58 @@
+from typing import Iterable
+
+from app.services.question_bank import QuestionRecord, question_bank
+from app.utils.text import text_hash
+
+
+class DuplicateIndex:
+    """
+    Live question ids grouped by the hash of their normalized text, so a
+    duplicate check is a single dictionary lookup.
+    """
+
+    def __init__(self) -> None:
+        self._ids: dict[str, list[int]] = {}
+        self._hashes: dict[int, str] = {}
+
+    def build(self, records: Iterable[QuestionRecord]) -> "DuplicateIndex":
+        built = DuplicateIndex()
+        for record in records:
+            built.add(record)
+        return built
+
+    def install(self, built: "DuplicateIndex") -> None:
+        self._ids = built._ids
+        self._hashes = built._hashes
+
+    def add(self, record: QuestionRecord) -> None:
+        if record.id in self._hashes:
+            return
+        question_hash = text_hash(record.text)
+        self._hashes[record.id] = question_hash
+        self._ids.setdefault(question_hash, []).append(record.id)
+
+    def discard(self, question_id: int) -> None:
+        question_hash = self._hashes.pop(question_id, None)
+        if question_hash is None:
+            return
+        ids = self._ids[question_hash]
+        ids.remove(question_id)
+        if not ids:
+            del self._ids[question_hash]
+
+    def find(self, question_hash: str) -> int | None:
+        """
+        Returns the smallest id of a live question with this text hash.
+        """
+        ids = self._ids.get(question_hash)
+        return min(ids) if ids else None
+
+    def clusters(self) -> list[list[int]]:
+        """
+        Groups of live questions with the same normalized text.
+        """
+        return sorted(sorted(ids) for ids in self._ids.values() if len(ids) > 1)
+
+
+duplicate_index = DuplicateIndex()
+question_bank.attach(duplicate_index)
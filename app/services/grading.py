@@ -0,0 +1,36 @@
+import random
+from typing import Iterable
+
+from app.services.question_bank import QuestionRecord
+
+
+def option_order(question: QuestionRecord, shuffle: bool = False) -> tuple[int, ...]:
+    """
+    Returns the permutation of option indexes in which a poll is rendered:
+    poll option i shows question.options[order[i]].
+    """
+    order = list(range(len(question.options)))
+    if shuffle:
+        random.shuffle(order)
+    return tuple(order)
+
+
+def correct_mask(question: QuestionRecord, order: Iterable[int]) -> int:
+    """
+    Bitmask of the poll indexes that hold correct options.
+    """
+    mask = 0
+    for poll_index, option_index in enumerate(order):
+        if question.options[option_index].is_correct:
+            mask |= 1 << poll_index
+    return mask
+
+
+def answer_mask(option_ids: Iterable[int]) -> int:
+    """
+    Bitmask of the poll indexes chosen by the user.
+    """
+    mask = 0
+    for poll_index in option_ids:
+        mask |= 1 << poll_index
+    return mask
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterable
+
+from app.config import settings
+from app.services.question_bank import QuestionRecord, question_bank
+from app.services.solver import TrigramIndex, question_solver
+from app.utils.text import search_form, trigrams
+
+# Более короткие фрагменты совпадают почти со всем банком
+MIN_FRAGMENT_LENGTH = 3
+# Больше совпадений не запоминается: такой фрагмент ещё слишком общий
+MAX_MATCHES = 500
+# Фрагмент без точных совпадений ищется с опечатками, если он не короче этого
+MIN_FUZZY_LENGTH = 10
+FUZZY_RESULTS = 10
+MATCH_CHUNK = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class InlineResult:
+    """
+    Cached matches of a fragment.
+
+    Attributes:
+        question_ids (tuple[int, ...]): Matching questions, best first.
+        complete (bool): Whether every question containing the fragment is
+            listed, so longer fragments can be answered by filtering.
+    """
+
+    question_ids: tuple[int, ...]
+    complete: bool
+
+
+class InlineSearch:
+    """
+    Question lookup for inline queries, which arrive on every keystroke.
+
+    A question matches when its text contains the fragment, compared in
+    search form. Results are kept in an LRU cache; a fragment that extends a
+    cached one filters the cached ids instead of going back to the trigram
+    index. The cache is dropped whenever the question bank changes.
+    """
+
+    def __init__(self, index: TrigramIndex, max_cached: int) -> None:
+        self._index = index
+        self._max_cached = max_cached
+        self._cache: OrderedDict[str, InlineResult] = OrderedDict()
+
+    def build(self, records: Iterable[QuestionRecord]) -> None:
+        return None
+
+    def install(self, built: None) -> None:
+        self._cache.clear()
+
+    def add(self, record: QuestionRecord) -> None:
+        self._cache.clear()
+
+    def discard(self, question_id: int) -> None:
+        self._cache.clear()
+
+    async def search(self, query: str) -> tuple[int, ...]:
+        fragment = search_form(query)
+        if len(fragment) < MIN_FRAGMENT_LENGTH:
+            return ()
+
+        cached = self._cache.get(fragment)
+        if cached is not None:
+            self._cache.move_to_end(fragment)
+            return cached.question_ids
+
+        await question_bank.ensure_loaded()
+        narrower = self._cached_prefix(fragment)
+        if narrower is not None:
+            candidates = narrower.question_ids
+        else:
+            candidates = self._index.containing(trigrams(fragment, padded=False))
+
+        result = await self._match(fragment, candidates)
+        if not result.question_ids and len(fragment) >= MIN_FUZZY_LENGTH:
+            matches = self._index.search(fragment, limit=FUZZY_RESULTS)
+            result = InlineResult(
+                tuple(match.question_id for match in matches), complete=False
+            )
+
+        self._cache[fragment] = result
+        if len(self._cache) > self._max_cached:
+            self._cache.popitem(last=False)
+        return result.question_ids
+
+    def _cached_prefix(self, fragment: str) -> InlineResult | None:
+        for end in range(len(fragment) - 1, MIN_FRAGMENT_LENGTH - 1, -1):
+            cached = self._cache.get(fragment[:end])
+            if cached is not None and cached.complete:
+                return cached
+        return None
+
+    async def _match(self, fragment: str, candidates: Iterable[int]) -> InlineResult:
+        # Проверка останавливается, как только совпадений больше MAX_MATCHES:
+        # такой фрагмент всё равно не будет сужаться по кэшу
+        candidates = iter(candidates)
+        ranked = []
+        while len(ranked) <= MAX_MATCHES:
+            chunk = list(islice(candidates, MATCH_CHUNK))
+            if not chunk:
+                break
+            for record in await question_bank.get_many(chunk):
+                text = search_form(record.text)
+                position = text.find(fragment)
+                if position >= 0:
+                    ranked.append((position > 0, len(text), record.id))
+
+        # Сначала вопросы, начинающиеся с фрагмента, затем более короткие
+        ranked.sort()
+        return InlineResult(
+            tuple(question_id for _, _, question_id in ranked[:MAX_MATCHES]),
+            complete=len(ranked) <= MAX_MATCHES,
+        )
+
+
+inline_search = InlineSearch(question_solver, settings.INLINE_CACHE_SIZE)
+question_bank.attach(inline_search)
@@ -0,0 +1,300 @@
+import asyncio
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Any, Iterable, Protocol, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import Select
+
+from app.database import read_session, read_session_maker
+from app.logger_setup import get_logger
+from app.models import Question, Option
+
+logger = get_logger(__name__)
+
+MAX_QUESTION_LENGTH = 300
+MIN_POLL_OPTIONS = 2
+MAX_POLL_OPTIONS = 10
+LOAD_CHUNK_SIZE = 500
+
+
+class Eligibility(Enum):
+    """
+    How a question can be delivered in a test.
+    """
+
+    POLL = "poll"
+    TEXT = "text"
+    BROKEN = "broken"
+
+
+@dataclass(frozen=True, slots=True)
+class OptionRecord:
+    """
+    Immutable snapshot of an answer option.
+    """
+
+    id: int
+    text: str
+    is_correct: bool
+
+
+@dataclass(frozen=True, slots=True)
+class QuestionRecord:
+    """
+    Immutable snapshot of a question with its options ordered by id.
+    """
+
+    id: int
+    text: str
+    has_options: bool
+    answer_text: str | None
+    options: tuple[OptionRecord, ...]
+    eligibility: Eligibility = Eligibility.TEXT
+    problem: str | None = None
+
+    @classmethod
+    def from_model(
+        cls, question: Question, options: Iterable[Option] | None = None
+    ) -> "QuestionRecord":
+        """
+        Builds a record from an ORM question. Options must be passed explicitly
+        when the relationship is not loaded.
+        """
+        if options is None:
+            options = question.options
+        record = cls(
+            id=question.id,
+            text=question.text,
+            has_options=question.has_options,
+            answer_text=question.answer_text,
+            options=tuple(
+                OptionRecord(
+                    id=option.id,
+                    text=option.option_text,
+                    is_correct=option.is_correct,
+                )
+                for option in sorted(options, key=lambda option: option.id)
+            ),
+        )
+        return record.classified()
+
+    def classified(self) -> "QuestionRecord":
+        """
+        Returns a copy with eligibility and problem filled in.
+        """
+        problem = None
+        if self.has_options:
+            if len(self.options) < MIN_POLL_OPTIONS:
+                problem = "меньше двух вариантов ответа"
+            elif len(self.options) > MAX_POLL_OPTIONS:
+                problem = f"больше {MAX_POLL_OPTIONS} вариантов ответа"
+            elif not any(option.is_correct for option in self.options):
+                problem = "нет правильного варианта ответа"
+            eligibility = Eligibility.POLL
+        else:
+            if len(self.text) > MAX_QUESTION_LENGTH:
+                problem = f"текст длиннее {MAX_QUESTION_LENGTH} символов"
+            elif not self.answer:
+                problem = "не указан ответ"
+            eligibility = Eligibility.TEXT
+
+        if problem is not None:
+            eligibility = Eligibility.BROKEN
+        return replace(self, eligibility=eligibility, problem=problem)
+
+    @property
+    def is_eligible(self) -> bool:
+        return self.eligibility is not Eligibility.BROKEN
+
+    @property
+    def correct_options(self) -> tuple[OptionRecord, ...]:
+        return tuple(option for option in self.options if option.is_correct)
+
+    @property
+    def answer(self) -> str | None:
+        """
+        Expected answer of a question without options: imported questions keep
+        it as their only option, manually added ones in answer_text.
+        """
+        if self.options:
+            return self.options[0].text
+        return self.answer_text
+
+
+class QuestionIndex(Protocol):
+    """
+    Derived structure kept in sync with the question bank cache.
+
+    build() may run in a worker thread while handlers read the index, so it
+    returns fresh structures without touching the index; install() swaps them
+    in on the event loop.
+    """
+
+    def build(self, records: Iterable[QuestionRecord]) -> Any: ...
+
+    def install(self, built: Any) -> None: ...
+
+    def add(self, record: QuestionRecord) -> None: ...
+
+    def discard(self, question_id: int) -> None: ...
+
+
+def live_questions_query(question_ids: Sequence[int]) -> Select:
+    """
+    Live questions with the given ids, their options loaded by selectinload.
+    """
+    return (
+        select(Question)
+        .options(selectinload(Question.options))
+        .where(Question.id.in_(question_ids), Question.deleted_at.is_(None))
+    )
+
+
+class QuestionBankCache:
+    """
+    In-process cache of the whole question bank.
+
+    Questions are loaded once with their options and served from memory;
+    repositories keep it up to date on every create and delete. Attached
+    indexes are updated along with it.
+
+    Indexes are built in a worker thread, so a load does not stall the
+    event loop, and installed together with the questions in one step on the
+    loop, so a reader sees either the old bank or the new one. Changes made
+    during a load are applied once it is installed.
+    """
+
+    def __init__(self) -> None:
+        self._questions: dict[int, QuestionRecord] = {}
+        self._indexes: list[QuestionIndex] = []
+        self._loaded = False
+        self._lock = asyncio.Lock()
+        self._pending: dict[int, QuestionRecord | None] | None = None
+
+    def attach(self, index: QuestionIndex) -> None:
+        self._indexes.append(index)
+        if self._loaded:
+            index.install(index.build(self._questions.values()))
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def load(self) -> None:
+        """
+        Loads all questions with their options and rebuilds the indexes.
+        """
+        async with self._lock:
+            await self._load()
+
+    async def ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._lock:
+            if not self._loaded:
+                await self._load()
+
+    async def _load(self) -> None:
+        self._loaded = False
+        self._pending = {}
+        try:
+            # Вопросы читаются частями, чтобы между ними обрабатывались
+            # другие обновления
+            records = {}
+            async with read_session_maker() as session:
+                result = await session.stream_scalars(
+                    select(Question)
+                    .options(selectinload(Question.options))
+                    .where(Question.deleted_at.is_(None))
+                    .execution_options(yield_per=LOAD_CHUNK_SIZE)
+                )
+                async for questions in result.partitions():
+                    for question in questions:
+                        records[question.id] = QuestionRecord.from_model(question)
+            built = await asyncio.to_thread(self._build_indexes, list(records.values()))
+            for index, index_built in zip(self._indexes, built):
+                index.install(index_built)
+            self._questions = records
+        finally:
+            pending, self._pending = self._pending, None
+
+        for question_id, record in pending.items():
+            if record is None:
+                self.discard(question_id)
+            else:
+                self.put(record)
+        self._loaded = True
+        logger.info(f"Question bank loaded: {len(self._questions)} questions")
+
+    def _build_indexes(self, records: list[QuestionRecord]) -> list[Any]:
+        return [index.build(records) for index in self._indexes]
+
+    async def count(self) -> int:
+        await self.ensure_loaded()
+        return len(self._questions)
+
+    async def broken(self) -> list[QuestionRecord]:
+        await self.ensure_loaded()
+        return [record for record in self._questions.values() if not record.is_eligible]
+
+    async def get(self, question_id: int) -> QuestionRecord | None:
+        records = await self.get_many([question_id])
+        return records[0] if records else None
+
+    async def get_many(self, question_ids: Sequence[int]) -> list[QuestionRecord]:
+        """
+        Returns questions in the given order. Questions missing from memory,
+        e.g. added by another process, are fetched with their options in a
+        single query; unknown ids are skipped.
+        """
+        await self.ensure_loaded()
+        missing = [
+            question_id
+            for question_id in question_ids
+            if question_id not in self._questions
+        ]
+        if missing:
+            async with read_session() as session:
+                result = await session.execute(live_questions_query(missing))
+                for question in result.scalars().all():
+                    self.put(QuestionRecord.from_model(question))
+
+        return [
+            self._questions[question_id]
+            for question_id in question_ids
+            if question_id in self._questions
+        ]
+
+    def put(self, record: QuestionRecord) -> None:
+        if self._pending is not None:
+            self._pending[record.id] = record
+            return
+        if record.id in self._questions:
+            for index in self._indexes:
+                index.discard(record.id)
+        self._questions[record.id] = record
+        for index in self._indexes:
+            index.add(record)
+
+    def discard(self, question_id: int) -> None:
+        if self._pending is not None:
+            self._pending[question_id] = None
+            return
+        if self._questions.pop(question_id, None) is None:
+            return
+        for index in self._indexes:
+            index.discard(question_id)
+
+    def invalidate(self) -> None:
+        """
+        Drops the cached bank; it is reloaded on the next access.
+        """
+        self._questions = {}
+        for index in self._indexes:
+            index.install(index.build(()))
+        self._loaded = False
+
+
+question_bank = QuestionBankCache()
@@ -0,0 +1,121 @@
+import heapq
+import random
+from array import array
+from dataclasses import dataclass
+from typing import Iterable
+
+from app.services.question_bank import QuestionRecord, question_bank
+
+
+@dataclass(frozen=True, slots=True)
+class AnswerStats:
+    """
+    Answer counters of a question.
+
+    Attributes:
+        attempts (int): How many times the question was answered.
+        correct (int): How many of the answers were correct.
+    """
+
+    attempts: int
+    correct: int
+
+    @property
+    def difficulty(self) -> float:
+        """
+        Share of wrong answers.
+        """
+        return 1 - self.correct / self.attempts if self.attempts else 0.0
+
+
+class QuestionSampler:
+    """
+    Dense array of eligible question ids that can be sampled without touching
+    the database. Broken questions never make it into the array.
+
+    Removal swaps the last id into the freed slot, so adds, removals and a
+    k-question draw are O(1), O(1) and O(k).
+
+    The sampler also mirrors the question_stats counters, so the difficulty
+    of a question is read in O(1) however long the answer history is.
+    """
+
+    def __init__(self) -> None:
+        self._ids = array("I")
+        self._positions: dict[int, int] = {}
+        self._stats: dict[int, AnswerStats] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, question_id: int) -> bool:
+        return question_id in self._positions
+
+    def build(self, records: Iterable[QuestionRecord]) -> tuple[array, dict[int, int]]:
+        ids = array("I", sorted(record.id for record in records if record.is_eligible))
+        return ids, {question_id: position for position, question_id in enumerate(ids)}
+
+    def install(self, built: tuple[array, dict[int, int]]) -> None:
+        self._ids, self._positions = built
+
+    def add(self, record: QuestionRecord) -> None:
+        if not record.is_eligible or record.id in self._positions:
+            return
+        self._positions[record.id] = len(self._ids)
+        self._ids.append(record.id)
+
+    def discard(self, question_id: int) -> None:
+        position = self._positions.pop(question_id, None)
+        if position is None:
+            return
+        last_id = self._ids.pop()
+        if last_id != question_id:
+            self._ids[position] = last_id
+            self._positions[last_id] = position
+
+    def sample(self, k: int, seed: int | None = None) -> list[int]:
+        """
+        Draws up to k distinct question ids. Passing a seed makes the draw
+        reproducible.
+        """
+        k = max(0, min(k, len(self._ids)))
+        rng = random.Random(seed) if seed is not None else random
+        return rng.sample(self._ids, k)
+
+    def load_stats(self, stats: Iterable[tuple[int, int, int]]) -> None:
+        """
+        Replaces the counters with (question_id, attempts, correct) rows.
+        """
+        self._stats = {
+            question_id: AnswerStats(attempts, correct)
+            for question_id, attempts, correct in stats
+        }
+
+    def record_answer(self, question_id: int, is_correct: bool) -> None:
+        stats = self._stats.get(question_id, AnswerStats(0, 0))
+        self._stats[question_id] = AnswerStats(
+            stats.attempts + 1, stats.correct + int(is_correct)
+        )
+
+    def stats(self, question_id: int) -> AnswerStats:
+        return self._stats.get(question_id, AnswerStats(0, 0))
+
+    def hardest(
+        self, limit: int, min_attempts: int = 1
+    ) -> list[tuple[int, AnswerStats]]:
+        """
+        Returns up to limit eligible questions with the largest share of wrong
+        answers among those answered at least min_attempts times.
+        """
+        answered = (
+            (question_id, stats)
+            for question_id, stats in self._stats.items()
+            if question_id in self._positions and stats.attempts >= min_attempts
+        )
+        return heapq.nlargest(
+            limit, answered, key=lambda item: (item[1].difficulty, item[1].attempts)
+        )
+
+
+question_sampler = QuestionSampler()
+question_bank.attach(question_sampler)
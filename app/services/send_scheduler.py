@@ -0,0 +1,389 @@
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from app.config import settings
+from app.logger_setup import get_logger
+from app.utils.messages import MESSAGE_LIMIT
+
+logger = get_logger(__name__)
+
+INTERACTIVE = 0
+BULK = 1
+
+_priority: ContextVar[int] = ContextVar("send_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def bulk_sends() -> Iterator[None]:
+    """
+    Marks requests made inside the block as bulk traffic: they yield to
+    interactive replies whenever both wait for the rate limits.
+    """
+    token = _priority.set(BULK)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """
+        Seconds until a token is available.
+        """
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass(slots=True)
+class _Send:
+    bot: Bot
+    method: TelegramMethod
+    make_request: NextRequestMiddlewareType
+    priority: int
+    seq: int
+    futures: list[asyncio.Future] = field(default_factory=list)
+    retries: int = 0
+
+    def set_result(self, result: Any) -> None:
+        for future in self.futures:
+            if not future.done():
+                future.set_result(result)
+
+    def set_exception(self, exception: BaseException) -> None:
+        for future in self.futures:
+            if not future.done():
+                future.set_exception(exception)
+
+
+class _Chat:
+    __slots__ = ("bucket", "queue", "busy", "blocked_until")
+
+    def __init__(self, bucket: TokenBucket) -> None:
+        self.bucket = bucket
+        self.queue: deque[_Send] = deque()
+        self.busy = False
+        self.blocked_until = 0.0
+
+
+@dataclass
+class SendSchedulerStats:
+    """
+    Snapshot of the outbound request metrics.
+
+    Attributes:
+        queued (int): Requests waiting for the rate limits.
+        sent (int): Requests sent through the scheduler so far.
+        merged (int): Text messages merged into a previous one.
+        retried (int): Requests repeated after a RetryAfter error.
+    """
+
+    queued: int
+    sent: int
+    merged: int
+    retried: int
+
+
+class SendScheduler(BaseRequestMiddleware):
+    """
+    Session middleware that paces requests addressed to a chat.
+
+    Each chat has a token bucket, and all chats share a global one. A request
+    that fits both is sent right away; otherwise it waits in its chat's queue,
+    and the dispatcher picks the oldest interactive request among the chats
+    that may send. Requests to one chat are sent one at a time and in order.
+    Plain text messages waiting next to each other for the same chat are
+    merged into one. A RetryAfter error pauses the chat and puts the request
+    back at the head of its queue.
+
+    Requests without a chat_id are only retried after RetryAfter.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30,
+        chat_rate: float = 1,
+        chat_burst: int = 3,
+        group_rate: float = 20 / 60,
+        max_retries: int = 3,
+    ) -> None:
+        self._global_rate = global_rate
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._group_rate = group_rate
+        self._max_retries = max_retries
+        self._global: TokenBucket | None = None
+        self._chats: dict[int | str, _Chat] = {}
+        self._pending: set[int | str] = set()
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._requests: set[asyncio.Task] = set()
+        self._seq = 0
+        self._sent = 0
+        self._merged = 0
+        self._retried = 0
+        self._last_sweep = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            loop = asyncio.get_running_loop()
+            self._global = TokenBucket(
+                self._global_rate, self._global_rate, loop.time()
+            )
+            self._last_sweep = loop.time()
+            self._task = loop.create_task(self._run(), name="send-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._requests:
+            await asyncio.gather(*self._requests, return_exceptions=True)
+        for chat in self._chats.values():
+            for send in chat.queue:
+                send.set_exception(RuntimeError("Send scheduler stopped"))
+        self._chats.clear()
+        self._pending.clear()
+
+    def stats(self) -> SendSchedulerStats:
+        return SendSchedulerStats(
+            queued=sum(len(self._chats[chat_id].queue) for chat_id in self._pending),
+            sent=self._sent,
+            merged=self._merged,
+            retried=self._retried,
+        )
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> TelegramType:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None or self._task is None:
+            return await self._request(make_request, bot, method)
+
+        loop = asyncio.get_running_loop()
+        send = _Send(bot, method, make_request, _priority.get(), self._next_seq())
+        send.futures.append(loop.create_future())
+
+        chat = self._chat(chat_id, loop.time())
+        now = loop.time()
+        if (
+            not chat.queue
+            and not chat.busy
+            and now >= chat.blocked_until
+            and chat.bucket.delay(now) == 0
+            and self._global.delay(now) == 0
+        ):
+            chat.bucket.take(now)
+            self._global.take(now)
+            await self._execute(chat_id, chat, send)
+        else:
+            chat.queue.append(send)
+            self._pending.add(chat_id)
+            self._wakeup.set()
+        return await send.futures[0]
+
+    async def _request(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> TelegramType:
+        for attempt in range(self._max_retries + 1):
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt == self._max_retries:
+                    raise
+                self._retried += 1
+                logger.warning(f"{type(method).__name__}: retry in {e.retry_after} s")
+                await asyncio.sleep(e.retry_after)
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _chat(self, chat_id: int | str, now: float) -> _Chat:
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            rate = self._group_rate if is_group else self._chat_rate
+            burst = 1 if is_group else self._chat_burst
+            chat = self._chats[chat_id] = _Chat(TokenBucket(rate, burst, now))
+        return chat
+
+    async def _execute(self, chat_id: int | str, chat: _Chat, send: _Send) -> None:
+        chat.busy = True
+        try:
+            result = await send.make_request(send.bot, send.method)
+        except TelegramRetryAfter as e:
+            if send.retries < self._max_retries:
+                send.retries += 1
+                self._retried += 1
+                logger.warning(f"Chat {chat_id}: retry in {e.retry_after} s")
+                chat.blocked_until = asyncio.get_running_loop().time() + e.retry_after
+                chat.queue.appendleft(send)
+                self._pending.add(chat_id)
+            else:
+                send.set_exception(e)
+        except Exception as e:
+            send.set_exception(e)
+        else:
+            self._sent += 1
+            send.set_result(result)
+        finally:
+            chat.busy = False
+            self._wakeup.set()
+
+    def _merge(self, send: _Send, queue: deque[_Send]) -> None:
+        """
+        Folds the plain text messages that follow send in the queue into it.
+        """
+        if not _is_plain_text(send.method):
+            return
+        options = send.method.model_dump(exclude={"text"})
+        text = send.method.text
+        while queue:
+            following = queue[0]
+            if (
+                following.priority != send.priority
+                or not _is_plain_text(following.method)
+                or following.method.model_dump(exclude={"text"}) != options
+                or len(text) + 2 + len(following.method.text) > MESSAGE_LIMIT
+            ):
+                break
+            queue.popleft()
+            text = f"{text}\n\n{following.method.text}"
+            send.futures.extend(following.futures)
+            self._merged += 1
+        if text != send.method.text:
+            send.method = send.method.model_copy(update={"text": text})
+
+    def _dispatch(self, now: float) -> float | None:
+        """
+        Sends every request the limits allow and returns how long to wait for
+        the next one, or None when nothing can be sent until a request ends.
+        """
+        while True:
+            best: tuple[int | str, _Chat] | None = None
+            wait: float | None = None
+            for chat_id in list(self._pending):
+                chat = self._chats[chat_id]
+                if not chat.queue:
+                    self._pending.discard(chat_id)
+                    continue
+                if chat.busy:
+                    continue
+                delay = max(chat.blocked_until - now, chat.bucket.delay(now))
+                if delay > 0:
+                    wait = delay if wait is None else min(wait, delay)
+                    continue
+                head = chat.queue[0]
+                if best is None or (head.priority, head.seq) < (
+                    best[1].queue[0].priority,
+                    best[1].queue[0].seq,
+                ):
+                    best = (chat_id, chat)
+
+            if best is None:
+                return wait
+            global_delay = self._global.delay(now)
+            if global_delay > 0:
+                return global_delay
+
+            chat_id, chat = best
+            send = chat.queue.popleft()
+            self._merge(send, chat.queue)
+            chat.bucket.take(now)
+            self._global.take(now)
+            chat.busy = True
+            task = asyncio.create_task(self._execute(chat_id, chat, send))
+            self._requests.add(task)
+            task.add_done_callback(self._requests.discard)
+
+    def _sweep(self, now: float) -> None:
+        """
+        Forgets idle chats whose bucket has refilled.
+        """
+        for chat_id in [
+            chat_id
+            for chat_id, chat in self._chats.items()
+            if not chat.queue
+            and not chat.busy
+            and now >= chat.blocked_until
+            and chat.bucket.full(now)
+        ]:
+            del self._chats[chat_id]
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            now = loop.time()
+            delay = self._dispatch(now)
+            if now - self._last_sweep >= 60:
+                self._last_sweep = now
+                self._sweep(now)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except TimeoutError:
+                pass
+
+
+def _is_plain_text(method: TelegramMethod) -> bool:
+    return (
+        isinstance(method, SendMessage)
+        and method.reply_markup is None
+        and method.entities is None
+        and method.reply_parameters is None
+        and method.reply_to_message_id is None
+    )
+
+
+send_scheduler = SendScheduler(
+    global_rate=settings.SEND_RATE_GLOBAL,
+    chat_rate=settings.SEND_RATE_PER_CHAT,
+    chat_burst=settings.SEND_BURST_PER_CHAT,
+    group_rate=settings.SEND_RATE_PER_GROUP_PER_MINUTE / 60,
+    max_retries=settings.SEND_MAX_RETRIES,
+)
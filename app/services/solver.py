@@ -0,0 +1,226 @@
+import bisect
+import heapq
+import math
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+from app.services.question_bank import QuestionRecord, question_bank
+from app.utils.text import trigrams
+
+# Доля триграмм запроса, которая должна найтись в вопросе
+MIN_SIMILARITY = 0.5
+# Триграмма из списка длиннее большего из порогов считается частой и не
+# используется для поиска кандидатов
+MIN_COMMON_POSTINGS = 1_000
+COMMON_SHARE = 50
+# Ограничения одного поиска: сколько позиций читается из списков и сколько
+# кандидатов сравнивается с запросом точно
+MAX_POSTINGS_READ = 8_000
+MAX_CANDIDATES = 200
+
+
+@dataclass(frozen=True, slots=True)
+class SolverMatch:
+    """
+    Question found for a pasted text.
+
+    Attributes:
+        question_id (int): Id of the question.
+        similarity (float): Share of the text's trigrams found in the question.
+    """
+
+    question_id: int
+    similarity: float
+
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to the questions containing them,
+    built over question and option texts.
+
+    A lookup counts the postings of the query's rarest trigrams, then scores
+    the best counted candidates exactly against their own trigram sets. The
+    postings read and the candidates scored are capped, so a lookup costs
+    about the same for any text, including one that is not in the bank.
+    Removed questions leave stale postings behind, which are skipped on
+    lookup and dropped once they make up half of the index.
+    """
+
+    def __init__(self) -> None:
+        self._gram_ids: dict[str, int] = {}
+        self._postings: list[array] = []
+        self._questions: dict[int, array] = {}
+        self._size = 0
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._questions)
+
+    def build(self, records: Iterable[QuestionRecord]) -> "TrigramIndex":
+        built = TrigramIndex()
+        for record in records:
+            built.add(record)
+        return built
+
+    def install(self, built: "TrigramIndex") -> None:
+        self._gram_ids = built._gram_ids
+        self._postings = built._postings
+        self._questions = built._questions
+        self._size = built._size
+        self._stale = built._stale
+
+    def add(self, record: QuestionRecord) -> None:
+        if record.id in self._questions:
+            return
+        text = " ".join([record.text, *(option.text for option in record.options)])
+        gram_ids = array("I", sorted(self._gram_id(gram) for gram in trigrams(text)))
+        self._questions[record.id] = gram_ids
+        for gram_id in gram_ids:
+            self._postings[gram_id].append(record.id)
+        self._size += len(gram_ids)
+
+    def discard(self, question_id: int) -> None:
+        gram_ids = self._questions.pop(question_id, None)
+        if gram_ids is None:
+            return
+        self._stale += len(gram_ids)
+        if self._stale * 2 > self._size:
+            self._compact()
+
+    def search(
+        self, text: str, limit: int = 1, min_similarity: float = MIN_SIMILARITY
+    ) -> list[SolverMatch]:
+        """
+        Returns up to limit questions most similar to the text, best first.
+        Questions are ranked by the share of the text's trigrams they contain,
+        ties go to the question with fewer extra trigrams.
+        """
+        query = trigrams(text)
+        if not query:
+            return []
+
+        known = [self._gram_ids[gram] for gram in query if gram in self._gram_ids]
+        needed = math.ceil(len(query) * min_similarity)
+        if len(known) < needed:
+            return []
+        known.sort(key=lambda gram_id: len(self._postings[gram_id]))
+
+        # Подходящий вопрос содержит хотя бы одну из первых
+        # len(known) - needed + 1 триграмм, поэтому дальше списки не читаются.
+        # Слишком частые триграммы и списки сверх бюджета тоже пропускаются:
+        # совпадение почти всегда находится по редким
+        common = max(MIN_COMMON_POSTINGS, len(self._questions) // COMMON_SHARE)
+        budget = MAX_POSTINGS_READ
+        counts: Counter[int] = Counter()
+        walked = 0
+        for gram_id in known[: len(known) - needed + 1]:
+            postings = self._postings[gram_id]
+            if len(postings) > common or len(postings) > budget:
+                break
+            counts.update(postings)
+            budget -= len(postings)
+            walked += 1
+        unread = len(known) - walked
+
+        # Кандидаты проверяются точно в порядке убывания счётчика; вопрос не
+        # наберёт больше своего счётчика и всех непрочитанных триграмм
+        candidates = heapq.nlargest(
+            MAX_CANDIDATES,
+            (
+                (count, question_id)
+                for question_id, count in counts.items()
+                if count + unread >= needed
+            ),
+        )
+        query_ids = set(known)
+        best: list[tuple[int, float, int]] = []
+        for count, question_id in candidates:
+            if count + unread < needed:
+                break
+            gram_ids = self._questions.get(question_id)
+            if gram_ids is None:
+                continue
+            overlap = len(query_ids.intersection(gram_ids))
+            if overlap < needed:
+                continue
+            jaccard = overlap / (len(query) + len(gram_ids) - overlap)
+            heapq.heappush(best, (overlap, jaccard, question_id))
+            if len(best) > limit:
+                heapq.heappop(best)
+            if len(best) == limit:
+                needed = max(needed, best[0][0])
+
+        return [
+            SolverMatch(question_id, overlap / len(query))
+            for overlap, _, question_id in sorted(best, reverse=True)
+        ]
+
+    def containing(self, grams: set[str]) -> Iterator[int]:
+        """
+        Lazily yields ids of questions whose text or options have all of the
+        trigrams. Only the rarest trigram's postings are walked; the others
+        are looked up in each candidate's own sorted trigram ids.
+        """
+        # Генератор читают между await, поэтому он держит структуры, с которых
+        # начал: после перестройки индекса номера триграмм другие
+        gram_ids_of, postings, questions = (
+            self._gram_ids,
+            self._postings,
+            self._questions,
+        )
+        gram_ids = []
+        for gram in grams:
+            gram_id = gram_ids_of.get(gram)
+            if gram_id is None:
+                return
+            gram_ids.append(gram_id)
+        if not gram_ids:
+            return
+
+        gram_ids.sort(key=lambda gram_id: len(postings[gram_id]))
+        rarest, rest = gram_ids[0], gram_ids[1:]
+        seen: set[int] = set()
+        for question_id in postings[rarest]:
+            own = questions.get(question_id)
+            if own is None or question_id in seen:
+                continue
+            seen.add(question_id)
+            if all(_contains(own, gram_id) for gram_id in rest):
+                yield question_id
+
+    def solve_many(self, texts: Iterable[str]) -> list[SolverMatch | None]:
+        """
+        Returns the best match for every text, or None where nothing is
+        similar enough.
+        """
+        matches = []
+        for text in texts:
+            found = self.search(text)
+            matches.append(found[0] if found else None)
+        return matches
+
+    def _gram_id(self, gram: str) -> int:
+        gram_id = self._gram_ids.get(gram)
+        if gram_id is None:
+            gram_id = self._gram_ids[gram] = len(self._postings)
+            self._postings.append(array("I"))
+        return gram_id
+
+    def _compact(self) -> None:
+        self._postings = [array("I") for _ in self._postings]
+        for question_id, gram_ids in self._questions.items():
+            for gram_id in gram_ids:
+                self._postings[gram_id].append(question_id)
+        self._size -= self._stale
+        self._stale = 0
+
+
+def _contains(gram_ids: array, gram_id: int) -> bool:
+    position = bisect.bisect_left(gram_ids, gram_id)
+    return position < len(gram_ids) and gram_ids[position] == gram_id
+
+
+question_solver = TrigramIndex()
+question_bank.attach(question_solver)
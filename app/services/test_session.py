@@ -0,0 +1,130 @@
+from array import array
+from datetime import datetime
+from typing import Mapping, Sequence
+
+from app.services.question_bank import QuestionRecord
+
+
+class TestSession:
+    """
+    State of a running test kept in FSM data.
+
+    The object is stored by reference: handlers mutate it in place and save it
+    back without copying the question list. Every mutation bumps version, so a
+    handler that awaited in between can tell that the session has moved on.
+
+    The drawn question records are kept as a snapshot, so questions deleted
+    during the test are still asked. They are left out when the session is
+    pickled to the FSM file and resolved again by id after a restart.
+
+    Attributes:
+        question_ids: Ids of the drawn questions in the order they are asked.
+        questions: Records of question_ids, None for a question that no
+            longer exists, or None as a whole until restore() after a restart.
+        cursor: Index of the current question in question_ids.
+        test_attempt_id: Id of the TestAttempt row the answers belong to.
+        start_time: When the test was started.
+        score: Number of correct answers so far.
+        answered: Number of graded answers so far.
+        poll_id: Id of the poll shown for the current question, if any.
+        poll_order: Permutation of option indexes the poll is rendered in.
+        correct_mask: Bitmask of the poll indexes holding correct options.
+        answer: Correct answer of the shown question, kept so the question
+            can be graded even if it is deleted before the user answers.
+        version: Incremented on every mutation.
+    """
+
+    __slots__ = (
+        "question_ids",
+        "questions",
+        "cursor",
+        "test_attempt_id",
+        "start_time",
+        "score",
+        "answered",
+        "poll_id",
+        "poll_order",
+        "correct_mask",
+        "answer",
+        "version",
+    )
+
+    def __init__(
+        self,
+        questions: Sequence[QuestionRecord],
+        test_attempt_id: int,
+        start_time: datetime,
+    ) -> None:
+        self.question_ids = array("I", (question.id for question in questions))
+        self.questions: tuple[QuestionRecord | None, ...] | None = tuple(questions)
+        self.cursor = 0
+        self.test_attempt_id = test_attempt_id
+        self.start_time = start_time
+        self.score = 0
+        self.answered = 0
+        self.poll_id: str | None = None
+        self.poll_order: tuple[int, ...] = ()
+        self.correct_mask = 0
+        self.answer: str | None = None
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.question_ids)
+
+    @property
+    def finished(self) -> bool:
+        return self.cursor >= len(self.question_ids)
+
+    @property
+    def current_question_id(self) -> int:
+        return self.question_ids[self.cursor]
+
+    @property
+    def current_question(self) -> QuestionRecord | None:
+        return self.questions[self.cursor]
+
+    def restore(self, questions: Mapping[int, QuestionRecord]) -> None:
+        """
+        Puts back the records dropped when the session was stored.
+        """
+        self.questions = tuple(
+            questions.get(question_id) for question_id in self.question_ids
+        )
+
+    def __getstate__(self) -> dict:
+        return {
+            name: getattr(self, name) for name in self.__slots__ if name != "questions"
+        }
+
+    def __setstate__(self, state: dict) -> None:
+        self.questions = None
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def show_poll(
+        self, poll_id: str, order: tuple[int, ...], mask: int, answer: str
+    ) -> None:
+        self.poll_id = poll_id
+        self.poll_order = order
+        self.correct_mask = mask
+        self.answer = answer
+        self.version += 1
+
+    def show_text(self, answer: str) -> None:
+        self.answer = answer
+        self.version += 1
+
+    def advance(self, is_correct: bool | None = None) -> None:
+        """
+        Moves to the next question. is_correct is None when the current
+        question is skipped without an answer.
+        """
+        if is_correct is not None:
+            self.answered += 1
+            self.score += is_correct
+        self.cursor += 1
+        self.poll_id = None
+        self.poll_order = ()
+        self.correct_mask = 0
+        self.answer = None
+        self.version += 1
@@ -0,0 +1,202 @@
+import asyncio
+import pickle
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+import aiosqlite
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+
+from app.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(slots=True)
+class StorageRecord:
+    state: str | None = None
+    data: dict[str, Any] = field(default_factory=dict)
+    touched_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def empty(self) -> bool:
+        return self.state is None and not self.data
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    FSM storage persisted to a local SQLite file.
+
+    Recently used records live in an in-memory LRU tier of at most
+    max_cached entries. Changes are coalesced and written in one transaction
+    every flush_interval seconds, so a record changed several times between
+    flushes is written once. Records idle for longer than ttl seconds are
+    evicted from memory and deleted from the file.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_cached: int = 10_000,
+        ttl: float = 24 * 60 * 60,
+        flush_interval: float = 0.2,
+    ) -> None:
+        self._path = path
+        self._max_cached = max_cached
+        self._ttl = ttl
+        self._flush_interval = flush_interval
+        self._db: aiosqlite.Connection | None = None
+        self._cache: OrderedDict[str, StorageRecord] = OrderedDict()
+        self._pending: dict[str, StorageRecord] = {}
+        self._flusher: asyncio.Task | None = None
+        self._last_sweep = time.monotonic()
+
+    async def open(self) -> None:
+        self._db = await aiosqlite.connect(self._path)
+        await self._db.execute("PRAGMA journal_mode=WAL")
+        await self._db.execute("PRAGMA synchronous=NORMAL")
+        await self._db.execute(
+            "CREATE TABLE IF NOT EXISTS fsm ("
+            "key TEXT PRIMARY KEY, state TEXT, data BLOB, updated_at REAL NOT NULL)"
+        )
+        await self._db.execute(
+            "CREATE INDEX IF NOT EXISTS ix_fsm_updated_at ON fsm (updated_at)"
+        )
+        await self._db.commit()
+        await self._delete_expired()
+        self._flusher = asyncio.create_task(
+            self._flush_periodically(), name="fsm-flush"
+        )
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._db is not None:
+            await self.flush()
+            await self._db.close()
+            self._db = None
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = await self._get_record(key)
+        record.state = state.state if isinstance(state, State) else state
+        self._mark_dirty(key, record)
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return (await self._get_record(key)).state
+
+    async def set_data(self, key: StorageKey, data: dict[str, Any]) -> None:
+        record = await self._get_record(key)
+        record.data = data.copy()
+        self._mark_dirty(key, record)
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return (await self._get_record(key)).data.copy()
+
+    async def flush(self) -> None:
+        """
+        Writes all pending changes in one transaction.
+        """
+        if not self._pending or self._db is None:
+            return
+        pending, self._pending = self._pending, {}
+
+        now = time.time()
+        upserts = [
+            (db_key, record.state, pickle.dumps(record.data), now)
+            for db_key, record in pending.items()
+            if not record.empty
+        ]
+        deletes = [(db_key,) for db_key, record in pending.items() if record.empty]
+        try:
+            await self._db.executemany(
+                "INSERT INTO fsm (key, state, data, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET state = excluded.state, "
+                "data = excluded.data, updated_at = excluded.updated_at",
+                upserts,
+            )
+            await self._db.executemany("DELETE FROM fsm WHERE key = ?", deletes)
+            await self._db.commit()
+        except Exception:
+            # Не теряем изменения: вернём их в очередь, если новых ещё нет
+            for db_key, record in pending.items():
+                self._pending.setdefault(db_key, record)
+            raise
+
+    @staticmethod
+    def _db_key(key: StorageKey) -> str:
+        return ":".join(
+            str(part) if part is not None else ""
+            for part in (
+                key.bot_id,
+                key.chat_id,
+                key.user_id,
+                key.thread_id,
+                key.business_connection_id,
+                key.destiny,
+            )
+        )
+
+    async def _get_record(self, key: StorageKey) -> StorageRecord:
+        db_key = self._db_key(key)
+        record = self._cache.get(db_key)
+        if record is None:
+            record = self._pending.get(db_key) or await self._load(db_key)
+            # Пока шла загрузка, запись могла появиться в кэше
+            record = self._cache.setdefault(db_key, record)
+            self._evict_overflow()
+        self._cache.move_to_end(db_key)
+        record.touched_at = time.monotonic()
+        return record
+
+    async def _load(self, db_key: str) -> StorageRecord:
+        if self._db is None:
+            return StorageRecord()
+        async with self._db.execute(
+            "SELECT state, data FROM fsm WHERE key = ? AND updated_at >= ?",
+            (db_key, time.time() - self._ttl),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return StorageRecord()
+        state, data = row
+        return StorageRecord(state=state, data=pickle.loads(data))
+
+    def _mark_dirty(self, key: StorageKey, record: StorageRecord) -> None:
+        self._pending[self._db_key(key)] = record
+
+    def _evict_overflow(self) -> None:
+        while len(self._cache) > self._max_cached:
+            self._cache.popitem(last=False)
+
+    def _evict_idle(self) -> None:
+        deadline = time.monotonic() - self._ttl
+        while self._cache:
+            db_key, record = next(iter(self._cache.items()))
+            if record.touched_at >= deadline:
+                break
+            del self._cache[db_key]
+
+    async def _delete_expired(self) -> None:
+        await self._db.execute(
+            "DELETE FROM fsm WHERE updated_at < ?", (time.time() - self._ttl,)
+        )
+        await self._db.commit()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_sweep >= min(self._ttl, 60 * 60):
+                    self._last_sweep = time.monotonic()
+                    self._evict_idle()
+                    await self._delete_expired()
+            except Exception as e:
+                logger.error(f"Failed to flush FSM storage: {e}")
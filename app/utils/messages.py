@@ -0,0 +1,22 @@
+from typing import Iterable
+
+MESSAGE_LIMIT = 4096
+
+
+def split_message(lines: Iterable[str], limit: int = MESSAGE_LIMIT) -> list[str]:
+    """
+    Joins lines into as few messages as possible without exceeding the
+    Telegram message length limit. Lines longer than the limit are cut.
+    """
+    messages: list[str] = []
+    current = ""
+    for line in lines:
+        line = line[:limit]
+        if current and len(current) + 1 + len(line) > limit:
+            messages.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    if current:
+        messages.append(current)
+    return messages
@@ -1,73 +1,335 @@
+"""
+Parser and bulk importer for question files.
+
+A file is a sequence of blocks separated by blank lines. The first line of a
+block is the question and every following line is an option; correct options
+start with "-". A block with a single option is a question without options
+whose answer is that option.
+
+With --sync the file is treated as the source of truth: only questions whose
+content changed are written, and questions missing from the file are
+soft-deleted.
+
+A running bot keeps its question bank in memory and does not see changes
+made by this script until it is restarted or an admin sends /reload.
+
+Usage:
+    python -m app.utils.parse_question questions.txt [--chunk-size 1000] [--sync]
+"""
+
+import argparse
 import asyncio
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import async_session_maker
-from app.models import Question, Option
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable, Iterator
+
+from app.repositories.questions import QuestionRepository
+from app.schemas.options import OptionCreate
+from app.schemas.questions import QuestionCreate
+from app.services.duplicates import duplicate_index
+from app.services.question_bank import question_bank
+from app.utils.text import content_hash, text_hash
+
+
+@dataclass(slots=True)
+class ParsedQuestion:
+    """
+    Question block read from a file.
+
+    Attributes:
+        line (int): Line number of the question text.
+        text (str): Question text.
+        options (list[tuple[str, bool]]): Option texts with correctness flags.
+    """
+
+    line: int
+    text: str
+    options: list[tuple[str, bool]] = field(default_factory=list)
+
+    @property
+    def has_options(self) -> bool:
+        return len(self.options) > 1
+
+    @property
+    def content_hash(self) -> str:
+        return content_hash(self.text, self.options)
+
+    @property
+    def text_hash(self) -> str:
+        return text_hash(self.text)
+
+    def to_schemas(self) -> tuple[QuestionCreate, list[OptionCreate]]:
+        question = QuestionCreate(
+            text=self.text,
+            has_options=self.has_options,
+            answer_text=None if self.has_options else self.text,
+            content_hash=self.content_hash,
+        )
+        options = [
+            OptionCreate(option_text=text, is_correct=is_correct)
+            for text, is_correct in self.options
+        ]
+        return question, options
+
+
+@dataclass(slots=True)
+class ParseError:
+    """
+    Block that was skipped, with the line it was found on.
+    """
+
+    line: int
+    message: str
+
+    def __str__(self) -> str:
+        return f"строка {self.line}: {self.message}"
+
+
+@dataclass
+class ImportResult:
+    """
+    Progress of an import.
+
+    Attributes:
+        imported (int): Questions saved so far.
+        errors (list[ParseError]): Blocks skipped so far.
+    """
+
+    imported: int = 0
+    errors: list[ParseError] = field(default_factory=list)
+
+
+@dataclass
+class SyncResult:
+    """
+    Outcome of a sync.
+
+    Attributes:
+        inserted (int): Questions added.
+        updated (int): Questions whose options were replaced.
+        deleted (int): Questions soft-deleted because the file no longer has them.
+        unchanged (int): Questions left as they are.
+        errors (list[ParseError]): Blocks skipped.
+    """
+
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    errors: list[ParseError] = field(default_factory=list)
 
 
-async def parse_questions_from_file(file_path: str) -> list[dict]:
-    with open(file_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
+def _validate(question: ParsedQuestion) -> ParsedQuestion | ParseError:
+    if not question.options:
+        return ParseError(question.line, "у вопроса нет ответа")
+    if question.has_options and not any(
+        is_correct for _, is_correct in question.options
+    ):
+        return ParseError(question.line, "не отмечен правильный вариант ответа")
+    return question
 
-    questions = []
-    current_question = None
 
-    for line in lines:
+def _checked(
+    question: ParsedQuestion, error: ParseError | None, require_answers: bool
+) -> ParsedQuestion | ParseError:
+    if not require_answers:
+        return question
+    return error or _validate(question)
+
+
+def _find_duplicate(
+    question: ParsedQuestion, seen: dict[str, int]
+) -> ParseError | None:
+    question_hash = question.text_hash
+    if question_hash in seen:
+        return ParseError(
+            question.line, f"повторяет вопрос со строки {seen[question_hash]}"
+        )
+    seen[question_hash] = question.line
+    question_id = duplicate_index.find(question_hash)
+    if question_id is not None:
+        return ParseError(question.line, f"такой вопрос уже есть (id {question_id})")
+    return None
+
+
+def parse_questions(
+    lines: Iterable[str], require_answers: bool = True
+) -> Iterator[ParsedQuestion | ParseError]:
+    """
+    Yields questions one block at a time, so a file of any size is read in
+    constant memory. Invalid blocks are yielded as errors and skipped; with
+    require_answers=False every block is yielded as is, which suits questions
+    pasted for solving.
+    """
+    current: ParsedQuestion | None = None
+    error: ParseError | None = None
+
+    for number, line in enumerate(lines, start=1):
         line = line.strip()
 
         if not line:
-            if current_question:
-                questions.append(current_question)
-                current_question = None
+            if current:
+                yield _checked(current, error, require_answers)
+                current, error = None, None
             continue
 
-        if current_question is None:
-            current_question = {"text": line, "options": []}
-        else:
-            is_correct = line.startswith("-")
-            option_text = line[1:].strip() if is_correct else line
-            current_question["options"].append(
-                {"text": option_text, "is_correct": is_correct}
-            )
+        if current is None:
+            current = ParsedQuestion(line=number, text=line)
+            continue
 
-    if current_question:
-        questions.append(current_question)
+        is_correct = line.startswith("-")
+        option_text = line[1:].strip() if is_correct else line
+        if not option_text and error is None:
+            error = ParseError(number, "пустой вариант ответа")
+        current.options.append((option_text, is_correct))
 
-    return questions
+    if current:
+        yield _checked(current, error, require_answers)
 
 
-async def save_questions_to_db(questions: list[dict], session: AsyncSession):
-    for question_data in questions:
-        has_options = len(question_data["options"]) > 1
+async def import_questions(
+    lines: Iterable[str],
+    chunk_size: int = 1000,
+    on_progress: Callable[[ImportResult], Awaitable[None]] | None = None,
+) -> ImportResult:
+    """
+    Saves parsed questions in chunks of chunk_size, one transaction per
+    chunk, and reports progress after every chunk. Questions that repeat a
+    live question or an earlier block of the file are skipped as errors.
+    """
+    result = ImportResult()
+    repository = QuestionRepository()
+    chunk: list[tuple[QuestionCreate, list[OptionCreate]]] = []
+    seen: dict[str, int] = {}
+    await question_bank.ensure_loaded()
+
+    async def save_chunk() -> None:
+        records = await repository.bulk_create_questions(chunk)
+        result.imported += len(records)
+        chunk.clear()
+        if on_progress is not None:
+            await on_progress(result)
+
+    for item in parse_questions(lines):
+        if isinstance(item, ParseError):
+            result.errors.append(item)
+            continue
+        error = _find_duplicate(item, seen)
+        if error is not None:
+            result.errors.append(error)
+            continue
+        chunk.append(item.to_schemas())
+        if len(chunk) >= chunk_size:
+            await save_chunk()
+
+    if chunk:
+        await save_chunk()
+    return result
 
-        question = Question(
-            text=question_data["text"],
-            has_options=has_options,
-            answer_text=None if has_options else question_data["text"],
-        )
 
-        if question_data["options"]:
-            for option_data in question_data["options"]:
-                option = Option(
-                    option_text=option_data["text"],
-                    is_correct=option_data["is_correct"],
+async def sync_questions(lines: Iterable[str]) -> SyncResult:
+    """
+    Makes the live questions match the file.
+
+    Blocks are compared by content hash, so unchanged questions cost one
+    lookup each. A changed block keeps the id of the live question with the
+    same normalized text and rewrites it; questions that are neither in the
+    file nor matched by text are soft-deleted.
+    """
+    result = SyncResult()
+    blocks: dict[str, ParsedQuestion] = {}
+    lines_by_text: dict[str, int] = {}
+    for item in parse_questions(lines):
+        if isinstance(item, ParseError):
+            result.errors.append(item)
+            continue
+        question_hash = item.text_hash
+        if question_hash in lines_by_text:
+            result.errors.append(
+                ParseError(
+                    item.line,
+                    f"повторяет вопрос со строки {lines_by_text[question_hash]}",
                 )
-                question.options.append(option)
+            )
+            continue
+        lines_by_text[question_hash] = item.line
+        blocks[item.content_hash] = item
+
+    repository = QuestionRepository()
+    stored = await repository.get_content_hashes()
+    added = [
+        block for content_hash, block in blocks.items() if content_hash not in stored
+    ]
+    removed = {
+        question_id
+        for content_hash, question_id in stored.items()
+        if content_hash not in blocks
+    }
+    result.unchanged = len(blocks) - len(added)
+
+    # Изменённый вопрос узнаём по нормализованному тексту: живой вопрос с таким
+    # текстом один, и других блоков с этим текстом в файле нет
+    candidates = await repository.get_by_text_hashes(
+        {block.text_hash for block in added}
+    )
+    inserts, updates = [], []
+    for block in added:
+        question_id = candidates.get(block.text_hash)
+        if question_id is None:
+            inserts.append(block.to_schemas())
+            continue
+        removed.discard(question_id)
+        updates.append((question_id, *block.to_schemas()))
 
-        session.add(question)
+    await repository.apply_sync(inserts, updates, sorted(removed))
+    result.inserted = len(inserts)
+    result.updated = len(updates)
+    result.deleted = len(removed)
+    return result
 
-    await session.commit()
 
+RELOAD_HINT = "Запущенный бот увидит изменения после /reload или перезапуска"
 
-async def main():
-    file_path = "questions.txt"
 
-    questions = await parse_questions_from_file(file_path)
-    print(questions)
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("file", nargs="?", default="questions.txt")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument(
+        "--sync", action="store_true", help="apply only the difference with the file"
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+
+    async def report(result: ImportResult) -> None:
+        print(
+            f"Импортировано {result.imported} вопросов, "
+            f"ошибок {len(result.errors)} ({time.perf_counter() - started:.1f} с)"
+        )
+
+    if args.sync:
+        with open(args.file, "r", encoding="utf-8-sig") as file:
+            result = await sync_questions(file)
+        for error in result.errors:
+            print(error)
+        print(
+            f"Готово за {time.perf_counter() - started:.2f} с: "
+            f"добавлено {result.inserted}, обновлено {result.updated}, "
+            f"удалено {result.deleted}, без изменений {result.unchanged}, "
+            f"пропущено {len(result.errors)}"
+        )
+        print(RELOAD_HINT)
+        return
+
+    with open(args.file, "r", encoding="utf-8-sig") as file:
+        result = await import_questions(file, args.chunk_size, report)
 
-    async with async_session_maker() as session:
-        await save_questions_to_db(questions, session)
+    for error in result.errors:
+        print(error)
+    print(f"Готово: {result.imported} вопросов, {len(result.errors)} пропущено")
+    print(RELOAD_HINT)
 
 
-# Запускаем главный асинхронный цикл
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Checks that hot-path queries are served by indexes.
+
+Runs EXPLAIN QUERY PLAN for every query the bot issues per update and fails
+if any of them scans a table or sorts in a temporary b-tree. By default the
+schema is built from the models; pass --database to check a migrated file.
+
+Usage:
+    python -m app.utils.query_plans [--database data/database.db]
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.sql import Select
+
+from app.database import Base
+from app.models import Option
+from app.repositories.questions import (
+    live_text_hashes_query,
+    question_page_query,
+    search_query,
+)
+from app.repositories.test_attempts import (
+    history_page_query,
+    question_stat_query,
+    user_stat_query,
+)
+from app.repositories.users import user_by_telegram_id_query
+from app.services.question_bank import live_questions_query
+
+# Запросы строятся теми же функциями, что и в репозиториях
+HOT_PATH_QUERIES: dict[str, Select] = {
+    "questions by ids": live_questions_query([1, 2, 3]),
+    # Второй запрос selectinload(Question.options) строит сам SQLAlchemy
+    "options of questions (selectinload)": select(Option).where(
+        Option.question_id.in_([1, 2, 3])
+    ),
+    "question list first page": question_page_query(20),
+    "question list next page": question_page_query(20, after_id=1),
+    "question list previous page": question_page_query(20, before_id=40),
+    "live questions by text hash": live_text_hashes_query(["a", "b"]),
+    "question search": search_query('"вопрос"*', 10, offset=10),
+    "user by telegram id": user_by_telegram_id_query(1),
+    "test history first page": history_page_query(1, 10),
+    "test history older page": history_page_query(1, 10, after_id=1),
+    "test history newer page": history_page_query(1, 10, before_id=1),
+    "user stats": user_stat_query(1),
+    "question stats": question_stat_query(1),
+}
+
+# Первая страница читает таблицу по первичному ключу и останавливается после
+# limit строк, поэтому её обход стоит столько же, сколько поиск по ключу
+ORDERED_WALKS = {"question list first page"}
+
+# Обход виртуальной таблицы с условием (например, MATCH) — поиск по индексу
+VIRTUAL_TABLE_LOOKUP = re.compile(r"VIRTUAL TABLE INDEX \d+:\S+")
+
+
+def compile_query(query: Select) -> str:
+    return str(
+        query.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    )
+
+
+def find_problems(plan: list[str], ordered_walk: bool = False) -> list[str]:
+    return [
+        detail
+        for detail in plan
+        if (
+            detail.startswith("SCAN ")
+            and not ordered_walk
+            and not VIRTUAL_TABLE_LOOKUP.search(detail)
+        )
+        or "TEMP B-TREE" in detail
+    ]
+
+
+def check(connection: sqlite3.Connection) -> bool:
+    ok = True
+    for name, query in HOT_PATH_QUERIES.items():
+        plan = [
+            row[-1]
+            for row in connection.execute(f"EXPLAIN QUERY PLAN {compile_query(query)}")
+        ]
+        problems = find_problems(plan, ordered_walk=name in ORDERED_WALKS)
+        status = "FAIL" if problems else "ok"
+        print(f"[{status:>4}] {name}: {'; '.join(plan)}")
+        ok = ok and not problems
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database", help="SQLite file to check instead of models")
+    args = parser.parse_args()
+
+    if args.database:
+        connection = sqlite3.connect(f"file:{args.database}?mode=ro", uri=True)
+    else:
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        connection = engine.raw_connection().driver_connection
+
+    if not check(connection):
+        print("Hot-path queries are not covered by indexes.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import hashlib
+import re
+from typing import Iterable
+
+# Знаки, которые не различают вопросы в конце текста
+TRAILING_PUNCTUATION = " .,:;!?…"
+
+# Больше слов в поисковом запросе не учитывается
+MAX_SEARCH_WORDS = 10
+
+
+def normalize_text(text: str) -> str:
+    """
+    Brings a question text to the form used for duplicate detection:
+    case-folded, whitespace collapsed, ё replaced with е and trailing
+    punctuation removed.
+    """
+    text = " ".join(text.split()).casefold().replace("ё", "е")
+    return text.rstrip(TRAILING_PUNCTUATION)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(
+        normalize_text(text).encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+
+def content_hash(text: str, options: Iterable[tuple[str, bool]]) -> str:
+    """
+    Hash of a question with its options in order, whitespace collapsed, so
+    reformatting a file does not change it.
+    """
+    lines = [" ".join(text.split())]
+    for option_text, is_correct in options:
+        lines.append(("-" if is_correct else " ") + " ".join(option_text.split()))
+    return hashlib.blake2b("\n".join(lines).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def search_form(text: str) -> str:
+    """
+    Normalized words of a text separated by single spaces, the form in which
+    texts are compared by trigrams and substrings.
+    """
+    return " ".join(re.findall(r"\w+", normalize_text(text)))
+
+
+def trigrams(text: str, padded: bool = True) -> set[str]:
+    """
+    Character trigrams of the search form of a text. Padding adds a space at
+    each end so that word boundaries take part in matching; a fragment that
+    may start or end mid-word is split without it.
+    """
+    text = search_form(text)
+    if padded:
+        text = f" {text} "
+    return {text[start : start + 3] for start in range(len(text) - 2)}
+
+
+def fts_query(text: str) -> str | None:
+    """
+    Turns free user input into an FTS5 MATCH expression: every word must
+    occur in the question or its options, as a whole word or a prefix.
+    Returns None when the input has no words.
+    """
+    words = re.findall(r"\w+", text.casefold().replace("ё", "е"))[:MAX_SEARCH_WORDS]
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
@@ -0,0 +1,99 @@
+"""
+Compares drawing a random test with ORDER BY random() against the in-memory
+question sampler.
+
+Usage:
+    python -m benchmarks.sampling [--sizes 1000 100000 1000000] [--k 50]
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import Question
+from app.services.question_bank import QuestionRecord
+from app.services.sampler import QuestionSampler
+
+
+def fill_bank(session: Session, size: int) -> None:
+    chunk = 50_000
+    for start in range(0, size, chunk):
+        session.execute(
+            insert(Question),
+            [
+                {"text": f"Вопрос {i}", "has_options": True}
+                for i in range(start, min(start + chunk, size))
+            ],
+        )
+    session.commit()
+
+
+def measure(fn, repeat: int) -> float:
+    """
+    Returns the median run time in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def run(size: int, k: int, repeat: int) -> None:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        fill_bank(session, size)
+
+        def order_by_random() -> list[int]:
+            questions = session.scalars(
+                select(Question).order_by(func.random()).limit(k)
+            ).all()
+            session.expunge_all()
+            return [question.id for question in questions]
+
+        ids = session.scalars(select(Question.id)).all()
+        sampler = QuestionSampler()
+        sampler.install(
+            sampler.build(
+                QuestionRecord(question_id, "", True, None, ()) for question_id in ids
+            )
+        )
+        seed = random.randrange(2**32)
+
+        sql_ms = measure(order_by_random, repeat)
+        sampler_ms = measure(lambda: sampler.sample(k), repeat)
+        seeded_ms = measure(lambda: sampler.sample(k, seed=seed), repeat)
+
+    engine.dispose()
+    print(
+        f"{size:>9} questions, k={k}: "
+        f"ORDER BY random() {sql_ms:9.3f} ms | "
+        f"sampler {sampler_ms:7.3f} ms | "
+        f"seeded sampler {seeded_ms:7.3f} ms | "
+        f"x{sql_ms / sampler_ms:,.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.k, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
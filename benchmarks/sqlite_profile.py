@@ -0,0 +1,129 @@
+"""
+Measures handler latency with and without the SQLite performance profile.
+
+Every simulated handler reads the user's latest attempts and records an
+answer through a write queue, which is what a test step costs the database.
+Without the profile reads and writes share one pool with SQLite defaults;
+with it the writer and the read-only pool are split and the pragmas from
+Settings are applied.
+
+Usage:
+    python -m benchmarks.sqlite_profile [--users 50] [--steps 40]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database import Base, WriteQueue, create_sqlite_engine
+from app.models import AttemptAnswer, Question, TestAttempt
+
+
+async def prepare(url: str, users: int) -> None:
+    engine = create_sqlite_engine(url, {})
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(
+            insert(Question), [{"text": f"Вопрос {i}"} for i in range(1_000)]
+        )
+        await connection.execute(
+            insert(TestAttempt),
+            [
+                {"user_id": user_id, "total_questions": 10, "score": 5}
+                for user_id in range(users)
+                for _ in range(20)
+            ],
+        )
+    await engine.dispose()
+
+
+async def run(url: str, profile: bool, users: int, steps: int) -> list[float]:
+    pragmas = settings.get_sqlite_pragmas() if profile else {}
+    if profile:
+        writer = create_sqlite_engine(url, pragmas)
+        reader = create_sqlite_engine(
+            url, pragmas, query_only=True, pool_size=settings.SQLITE_READ_POOL_SIZE
+        )
+    else:
+        writer = reader = create_sqlite_engine(url, pragmas, pool_size=5)
+
+    async with writer.connect():
+        pass
+    write_queue = WriteQueue(async_sessionmaker(writer, expire_on_commit=False))
+    read_session_maker = async_sessionmaker(reader, expire_on_commit=False)
+    write_queue.start()
+
+    latencies: list[float] = []
+
+    async def handler(user_id: int, step: int) -> None:
+        async with read_session_maker() as session:
+            result = await session.execute(
+                select(TestAttempt)
+                .where(TestAttempt.user_id == user_id)
+                .order_by(TestAttempt.id.desc())
+                .limit(10)
+            )
+            result.scalars().all()
+
+        async def job(session: AsyncSession) -> None:
+            session.add(
+                AttemptAnswer(
+                    test_attempt_id=user_id + 1,
+                    question_id=step + 1,
+                    is_correct=step % 2 == 0,
+                )
+            )
+
+        await write_queue.submit(job)
+
+    async def user(user_id: int) -> None:
+        for step in range(steps):
+            started = time.perf_counter()
+            await handler(user_id, step)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*(user(user_id) for user_id in range(users)))
+    await write_queue.stop()
+    await writer.dispose()
+    if reader is not writer:
+        await reader.dispose()
+    return latencies
+
+
+def percentile(values: list[float], percent: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--steps", type=int, default=40)
+    args = parser.parse_args()
+
+    for profile in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            url = f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}"
+            await prepare(url, args.users)
+            started = time.perf_counter()
+            latencies = await run(url, profile, args.users, args.steps)
+            elapsed = time.perf_counter() - started
+
+        print(
+            f"profile {'on ' if profile else 'off'}: "
+            f"p50 {percentile(latencies, 50):7.2f} ms | "
+            f"p99 {percentile(latencies, 99):7.2f} ms | "
+            f"mean {statistics.mean(latencies):7.2f} ms | "
+            f"{len(latencies) / elapsed:,.0f} handlers/s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
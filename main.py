@@ -1,28 +1,125 @@
+import argparse
 import asyncio
 
 from aiogram import Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 
 from app.config import settings
+from app.database import init_database, write_queue
 from app.logger_setup import get_logger
 from app.handlers import register_all_handlers
+from app.middlewares import register_all_middlewares
+from app.middlewares.database import ReadSessionReleaseMiddleware
+from app.repositories.test_attempts import TestAttemptRepository
+from app.services.question_bank import question_bank
+from app.services.sampler import question_sampler
+from app.services.send_scheduler import send_scheduler
+from app.storage import SQLiteStorage
 
 logger = get_logger(__name__)
-dp = Dispatcher()
+storage = SQLiteStorage(
+    settings.get_fsm_db_path(),
+    max_cached=settings.FSM_CACHE_SIZE,
+    ttl=settings.FSM_TTL_HOURS * 60 * 60,
+    flush_interval=settings.FSM_FLUSH_INTERVAL_MS / 1000,
+)
+dp = Dispatcher(storage=storage)
 
 
-async def main() -> None:
+async def on_startup(bot: Bot) -> None:
+    await init_database()
+    await question_bank.load()
+    question_sampler.load_stats(await TestAttemptRepository().get_question_stats())
+    await storage.open()
+    write_queue.start()
+    send_scheduler.start()
+
+    if settings.BOT_MODE == "polling":
+        await bot.delete_webhook()
+    elif settings.WEBHOOK_URL:
+        await bot.set_webhook(
+            f"{settings.WEBHOOK_URL.rstrip('/')}{settings.WEBHOOK_PATH}",
+            secret_token=settings.WEBHOOK_SECRET,
+            max_connections=settings.MAX_CONCURRENT_UPDATES,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
+        logger.info(f"Webhook set to {settings.WEBHOOK_URL}{settings.WEBHOOK_PATH}")
+    else:
+        logger.info("WEBHOOK_URL is not set, the webhook is left unchanged")
+
+
+async def on_shutdown() -> None:
+    await send_scheduler.stop()
+    await write_queue.stop()
+    await storage.close()
+
+
+def create_bot() -> Bot:
     logger.info("Initializing the bot...")
     bot = Bot(
         token=settings.TOKEN,
         default=DefaultBotProperties(parse_mode=ParseMode.HTML),
     )
+    # Соединение отпускается до ожидания в очереди планировщика отправки
+    bot.session.middleware(ReadSessionReleaseMiddleware())
+    bot.session.middleware(send_scheduler)
+    register_all_middlewares(dp)
     register_all_handlers(dp)
+    dp.startup.register(on_startup)
+    dp.shutdown.register(on_shutdown)
+    return bot
+
+
+async def run_polling() -> None:
+    bot = create_bot()
     logger.info("Starting bot polling...")
     await dp.start_polling(bot)
 
 
+def create_webhook_app() -> web.Application:
+    # Без секрета проверка заголовка отключается, и любой, кто знает адрес,
+    # может присылать поддельные обновления, в том числе от имени админов
+    if not settings.WEBHOOK_SECRET:
+        raise RuntimeError("WEBHOOK_SECRET must be set in webhook mode")
+    bot = create_bot()
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=settings.WEBHOOK_SECRET,
+    ).register(app, path=settings.WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--mode",
+        choices=["polling", "webhook"],
+        default=settings.BOT_MODE,
+        help="how updates are received, BOT_MODE by default",
+    )
+    args = parser.parse_args()
+    settings.BOT_MODE = args.mode
+
+    if settings.BOT_MODE == "webhook":
+        logger.info(
+            f"Starting webhook server on {settings.WEBHOOK_HOST}:{settings.WEBHOOK_PORT}"
+            f"{settings.WEBHOOK_PATH}..."
+        )
+        web.run_app(
+            create_webhook_app(),
+            host=settings.WEBHOOK_HOST,
+            port=settings.WEBHOOK_PORT,
+        )
+    else:
+        asyncio.run(run_polling())
+
+
 if __name__ == "__main__":
     logger.info("Starting main function...")
-    asyncio.run(main())
+    main()
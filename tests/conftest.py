@@ -0,0 +1,43 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# Настройки читаются при импорте app.config, поэтому задаются до импорта
+# тестируемых модулей. Путь к базе задаётся всегда, чтобы тесты не тронули
+# рабочую базу из окружения
+os.environ.setdefault("TOKEN", "123456:TEST")
+os.environ["SQLITE_DB_PATH"] = os.path.join(tempfile.mkdtemp(), "database.db")
+os.environ.setdefault("ADMINS", "1")
+
+
+@pytest.fixture
+def run_app():
+    """
+    Runs a coroutine against an empty application database created from the
+    models, with a cold question bank.
+    """
+    from app.database import Base, engine, read_engine
+    from app.services.question_bank import question_bank
+    import app.models  # noqa: F401
+
+    path = os.environ["SQLITE_DB_PATH"]
+
+    def run(coroutine):
+        async def main():
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+            question_bank.invalidate()
+            try:
+                return await coroutine
+            finally:
+                await engine.dispose()
+                await read_engine.dispose()
+
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,52 @@
+import sqlite3
+
+from app.config import settings
+from app.services.question_bank import question_bank
+from app.utils.parse_question import import_questions
+
+QUESTIONS = 3000
+
+
+def questions_file() -> list[str]:
+    lines = []
+    for number in range(QUESTIONS):
+        lines.append(f"Вопрос номер {number}?")
+        # У вопросов разное число вариантов, чтобы сдвиг id был заметен
+        for option in range(2 + number % 3):
+            marker = "- " if option == number % 2 else ""
+            lines.append(f"{marker}ответ {number}.{option}")
+        lines.append("")
+    return lines
+
+
+def test_bulk_import_links_options_to_their_questions(run_app):
+    async def scenario():
+        result = await import_questions(questions_file(), chunk_size=1000)
+        return result, await question_bank.get_many(range(1, QUESTIONS + 1))
+
+    result, records = run_app(scenario())
+    assert result.imported == QUESTIONS
+    assert not result.errors
+    assert len(records) == QUESTIONS
+
+    with sqlite3.connect(settings.SQLITE_DB_PATH) as connection:
+        rows = connection.execute(
+            "SELECT questions.id, questions.text, options.id, options.option_text, "
+            "options.is_correct FROM options "
+            "JOIN questions ON questions.id = options.question_id "
+            "ORDER BY options.id"
+        ).fetchall()
+    stored = {}
+    for question_id, text, option_id, option_text, is_correct in rows:
+        number = text.removeprefix("Вопрос номер ").removesuffix("?")
+        assert option_text.startswith(f"ответ {number}.")
+        stored.setdefault(question_id, []).append(
+            (option_id, option_text, bool(is_correct))
+        )
+
+    for record in records:
+        number = record.text.removeprefix("Вопрос номер ").removesuffix("?")
+        assert [(o.id, o.text, o.is_correct) for o in record.options] == stored[
+            record.id
+        ]
+        assert len(record.options) == 2 + int(number) % 3
@@ -0,0 +1,42 @@
+import os
+import sqlite3
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine
+
+from app.config import settings
+from app.database import Base
+from app.utils.query_plans import check, find_problems
+
+ALEMBIC_INI = Path(__file__).parent.parent / "alembic.ini"
+
+
+def test_plan_problems_are_detected():
+    assert find_problems(["SCAN questions"]) == ["SCAN questions"]
+    assert find_problems(["USE TEMP B-TREE FOR ORDER BY"], ordered_walk=True)
+    assert not find_problems(["SCAN questions_fts VIRTUAL TABLE INDEX 32:rM2"])
+    assert find_problems(["SCAN questions_fts VIRTUAL TABLE INDEX 0:"])
+
+
+def test_hot_path_queries_use_indexes_on_model_schema():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    connection = engine.raw_connection()
+    try:
+        assert check(connection.driver_connection)
+    finally:
+        connection.close()
+
+
+def test_hot_path_queries_use_indexes_on_migrated_schema():
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(settings.SQLITE_DB_PATH + suffix):
+            os.remove(settings.SQLITE_DB_PATH + suffix)
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    command.upgrade(config, "head")
+
+    with sqlite3.connect(settings.SQLITE_DB_PATH) as connection:
+        assert check(connection)
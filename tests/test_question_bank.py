@@ -0,0 +1,78 @@
+import asyncio
+import sqlite3
+import threading
+
+from app.config import settings
+from app.services.question_bank import question_bank
+from app.services.sampler import question_sampler
+from app.services.solver import question_solver
+from app.utils.parse_question import import_questions
+
+NEW_QUESTION = "Сколько ног у паука?"
+
+
+class GateIndex:
+    """
+    Index whose build blocks until released, holding a reload mid-way.
+    """
+
+    def __init__(self) -> None:
+        self.armed = False
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def build(self, records) -> None:
+        if self.armed:
+            self.entered.set()
+            self.release.wait(timeout=10)
+
+    def install(self, built) -> None:
+        pass
+
+    def add(self, record) -> None:
+        pass
+
+    def discard(self, question_id: int) -> None:
+        pass
+
+
+def add_question_behind_the_bank() -> None:
+    with sqlite3.connect(settings.SQLITE_DB_PATH) as connection:
+        connection.execute(
+            "INSERT INTO questions (text, has_options, answer_text, created_at, "
+            "updated_at) VALUES (?, 0, 'восемь', datetime(), datetime())",
+            (NEW_QUESTION,),
+        )
+
+
+def test_reload_swaps_indexes_in_one_step(run_app):
+    gate = GateIndex()
+
+    async def scenario():
+        await import_questions(
+            line
+            for number in range(50)
+            for line in (f"Вопрос номер {number}?", f"- ответ {number}", "")
+        )
+        add_question_behind_the_bank()
+        question_bank.attach(gate)
+        gate.armed = True
+        try:
+            reload = asyncio.create_task(question_bank.load())
+            while not gate.entered.is_set():
+                await asyncio.sleep(0.01)
+
+            # Остальные индексы уже собраны в потоке, но читатели видят старые
+            during = len(question_sampler), question_solver.search(NEW_QUESTION)
+            gate.release.set()
+            await reload
+            after = len(question_sampler), question_solver.search(NEW_QUESTION)
+        finally:
+            gate.release.set()
+            question_bank._indexes.remove(gate)
+        return during, after
+
+    (during_size, during_found), (after_size, after_found) = run_app(scenario())
+    assert (during_size, during_found) == (50, [])
+    assert after_size == 51
+    assert after_found[0].similarity == 1.0
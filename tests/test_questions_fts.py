@@ -0,0 +1,73 @@
+import sqlite3
+
+from app.config import settings
+from app.repositories.questions import QuestionRepository
+from app.schemas.options import OptionCreate
+from app.schemas.questions import QuestionCreate
+from app.utils.parse_question import import_questions, sync_questions
+
+
+def block(number: int, option_prefix: str = "ответ") -> list[str]:
+    lines = [f"Вопрос номер {number}?"]
+    for option in range(3):
+        marker = "- " if option == 0 else ""
+        lines.append(f"{marker}{option_prefix} {number}.{option}")
+    return lines + [""]
+
+
+def fold(text: str) -> str:
+    return text.replace("ё", "е").replace("Ё", "Е")
+
+
+def expected_index(connection: sqlite3.Connection) -> dict[int, tuple[str, str]]:
+    options: dict[int, list[str]] = {}
+    for question_id, option_text in connection.execute(
+        "SELECT question_id, option_text FROM options ORDER BY id"
+    ):
+        options.setdefault(question_id, []).append(fold(option_text))
+    return {
+        question_id: (fold(text), "\n".join(options.get(question_id, [])))
+        for question_id, text in connection.execute(
+            "SELECT id, text FROM questions WHERE deleted_at IS NULL"
+        )
+    }
+
+
+def test_bulk_writes_and_single_writes_keep_index_in_sync(run_app):
+    async def scenario():
+        imported = [line for number in range(1200) for line in block(number)]
+        await import_questions(imported, chunk_size=500)
+
+        # Первые 100 вопросов меняют варианты, последние 200 удаляются,
+        # 100 добавляются
+        synced = [
+            line
+            for number in range(1300)
+            if not 1000 <= number < 1200
+            for line in block(number, "ёлка" if number < 100 else "ответ")
+        ]
+        result = await sync_questions(synced)
+        assert (result.inserted, result.updated, result.deleted) == (100, 100, 200)
+
+        await QuestionRepository().create_question_with_options(
+            QuestionCreate(text="Одиночный вопрос", has_options=True),
+            [
+                OptionCreate(option_text="Ёж", is_correct=True),
+                OptionCreate(option_text="Уж"),
+            ],
+        )
+
+    run_app(scenario())
+
+    with sqlite3.connect(settings.SQLITE_DB_PATH) as connection:
+        index = {
+            rowid: (text, options)
+            for rowid, text, options in connection.execute(
+                "SELECT rowid, text, options FROM questions_fts"
+            )
+        }
+        assert index == expected_index(connection)
+        assert connection.execute(
+            "SELECT count(*) FROM questions_fts_bulk"
+        ).fetchone() == (0,)
+        assert len(index) == 1101
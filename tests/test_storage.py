@@ -0,0 +1,118 @@
+import asyncio
+import sqlite3
+
+from aiogram.fsm.storage.base import StorageKey
+
+from app.storage import SQLiteStorage
+
+KEY = StorageKey(bot_id=1, chat_id=100, user_id=100)
+
+
+def stored_keys(path) -> list[str]:
+    with sqlite3.connect(path) as connection:
+        return [key for (key,) in connection.execute("SELECT key FROM fsm")]
+
+
+def test_close_flushes_pending_changes(tmp_path):
+    path = str(tmp_path / "fsm.db")
+
+    async def main():
+        # Периодический сброс не успеет сработать, данные пишет только close()
+        storage = SQLiteStorage(path, flush_interval=60)
+        await storage.open()
+        await storage.set_state(KEY, "Quiz:question")
+        await storage.set_data(KEY, {"index": 3})
+        assert stored_keys(path) == []
+        await storage.close()
+
+        storage = SQLiteStorage(path, flush_interval=60)
+        await storage.open()
+        try:
+            return await storage.get_state(KEY), await storage.get_data(KEY)
+        finally:
+            await storage.close()
+
+    assert asyncio.run(main()) == ("Quiz:question", {"index": 3})
+
+
+def test_expired_records_are_not_restored(tmp_path):
+    path = str(tmp_path / "fsm.db")
+
+    async def main():
+        storage = SQLiteStorage(path, ttl=0.2, flush_interval=60)
+        await storage.open()
+        await storage.set_state(KEY, "Quiz:question")
+        await storage.close()
+        assert len(stored_keys(path)) == 1
+
+        await asyncio.sleep(0.3)
+        storage = SQLiteStorage(path, ttl=0.2, flush_interval=60)
+        await storage.open()
+        try:
+            assert stored_keys(path) == []
+            return await storage.get_state(KEY), await storage.get_data(KEY)
+        finally:
+            await storage.close()
+
+    assert asyncio.run(main()) == (None, {})
+
+
+def test_idle_records_expire_while_running(tmp_path):
+    path = str(tmp_path / "fsm.db")
+
+    async def main():
+        storage = SQLiteStorage(path, ttl=0.2, flush_interval=0.05)
+        await storage.open()
+        try:
+            await storage.set_state(KEY, "Quiz:question")
+            await asyncio.sleep(0.1)
+            assert len(stored_keys(path)) == 1
+            # Запись не трогали дольше ttl: её вытесняет фоновая очистка
+            await asyncio.sleep(0.4)
+            assert stored_keys(path) == []
+            return await storage.get_state(KEY)
+        finally:
+            await storage.close()
+
+    assert asyncio.run(main()) is None
+
+
+def test_cleared_record_is_deleted_on_flush(tmp_path):
+    path = str(tmp_path / "fsm.db")
+
+    async def main():
+        storage = SQLiteStorage(path, flush_interval=60)
+        await storage.open()
+        try:
+            await storage.set_state(KEY, "Quiz:question")
+            await storage.set_data(KEY, {"index": 3})
+            await storage.flush()
+            assert len(stored_keys(path)) == 1
+
+            await storage.set_state(KEY, None)
+            await storage.set_data(KEY, {})
+            await storage.flush()
+            assert stored_keys(path) == []
+        finally:
+            await storage.close()
+
+    asyncio.run(main())
+
+
+def test_evicted_record_is_reloaded_from_file(tmp_path):
+    path = str(tmp_path / "fsm.db")
+    other = StorageKey(bot_id=1, chat_id=200, user_id=200)
+
+    async def main():
+        storage = SQLiteStorage(path, max_cached=1, flush_interval=60)
+        await storage.open()
+        try:
+            await storage.set_data(KEY, {"index": 1})
+            await storage.flush()
+            # Вторая запись вытесняет первую из кэша
+            await storage.set_data(other, {"index": 2})
+            return await storage.get_data(KEY), await storage.get_data(other)
+        finally:
+            await storage.close()
+
+    assert asyncio.run(main()) == ({"index": 1}, {"index": 2})
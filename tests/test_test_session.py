@@ -0,0 +1,33 @@
+import pickle
+from datetime import datetime
+
+from app.services import test_session
+from app.services.question_bank import QuestionRecord
+
+
+def record(question_id: int) -> QuestionRecord:
+    return QuestionRecord(
+        id=question_id,
+        text=f"Вопрос {question_id}",
+        has_options=False,
+        answer_text="ответ",
+        options=(),
+    ).classified()
+
+
+def test_session_keeps_snapshot_in_memory_and_ids_on_disk():
+    questions = [record(question_id) for question_id in (5, 3, 8)]
+    session = test_session.TestSession(questions, 1, datetime.now())
+    session.advance(True)
+    assert session.current_question is questions[1]
+
+    restored = pickle.loads(pickle.dumps(session))
+    assert restored.questions is None
+    assert list(restored.question_ids) == [5, 3, 8]
+    assert (restored.cursor, restored.score, restored.answered) == (1, 1, 1)
+
+    # Вопрос 3 удалён, пока сессия лежала в хранилище
+    restored.restore({5: questions[0], 8: questions[2]})
+    assert restored.current_question is None
+    restored.advance()
+    assert restored.current_question is questions[2]
@@ -0,0 +1,55 @@
+from sqlalchemy import event, func, select
+
+from app.database import read_engine, read_session, read_session_maker
+from app.middlewares.database import (
+    DatabaseSessionMiddleware,
+    ReadSessionReleaseMiddleware,
+)
+from app.models import Question
+from app.repositories.questions import QuestionRepository
+from app.schemas.questions import QuestionCreate
+
+
+async def count_questions() -> int:
+    async with read_session() as session:
+        return await session.scalar(select(func.count(Question.id)))
+
+
+def test_update_reads_share_one_transaction_between_requests(run_app):
+    transactions = []
+
+    def on_begin(connection):
+        transactions.append(connection)
+
+    event.listen(read_engine.sync_engine, "begin", on_begin)
+
+    async def make_request(bot, method):
+        return True
+
+    async def handler(event, data):
+        counts = [await count_questions(), await count_questions()]
+        assert len(transactions) == 1
+
+        # Соединение отпускается перед запросом к Telegram
+        await ReadSessionReleaseMiddleware()(make_request, None, None)
+        assert not data["session"].in_transaction()
+        counts.append(await count_questions())
+        assert len(transactions) == 2
+
+        # На время записи соединение тоже отпускается, а запись видна
+        # следующему чтению того же обновления
+        await QuestionRepository().create_question(
+            QuestionCreate(text="Новый вопрос", answer_text="ответ")
+        )
+        assert not data["session"].in_transaction()
+        counts.append(await count_questions())
+        return counts
+
+    async def scenario():
+        middleware = DatabaseSessionMiddleware(read_session_maker)
+        return await middleware(handler, None, {})
+
+    try:
+        assert run_app(scenario()) == [0, 0, 0, 1]
+    finally:
+        event.remove(read_engine.sync_engine, "begin", on_begin)
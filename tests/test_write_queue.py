@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+from sqlalchemy import Integer, String, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.database import WriteQueue, create_sqlite_engine
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String, unique=True)
+
+
+def add_item(name: str):
+    async def job(session: AsyncSession) -> str:
+        session.add(Item(name=name))
+        await session.flush()
+        return name
+
+    return job
+
+
+async def stored_names(session_maker: async_sessionmaker[AsyncSession]) -> set[str]:
+    async with session_maker() as session:
+        return set((await session.scalars(select(Item.name))).all())
+
+
+def run_with_queue(tmp_path, scenario, **queue_options):
+    async def main():
+        engine = create_sqlite_engine(f"sqlite+aiosqlite:///{tmp_path / 'w.db'}", {})
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        queue = WriteQueue(session_maker, **queue_options)
+        try:
+            return await scenario(queue, session_maker)
+        finally:
+            await queue.stop()
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_jobs_submitted_together_share_one_transaction(tmp_path):
+    async def scenario(queue, session_maker):
+        queue.start()
+        names = [f"item{i}" for i in range(10)]
+        results = await asyncio.gather(*(queue.submit(add_item(n)) for n in names))
+        assert results == names
+        assert await stored_names(session_maker) == set(names)
+        return queue.stats()
+
+    stats = run_with_queue(tmp_path, scenario, max_delay=0.05)
+    assert stats.batches == 1
+    assert stats.jobs == 10
+    assert stats.failed == 0
+
+
+def test_failing_job_only_fails_its_own_caller(tmp_path):
+    async def scenario(queue, session_maker):
+        # Запуск до start() выполняется сразу в отдельной транзакции
+        await queue.submit(add_item("taken"))
+        queue.start()
+        results = await asyncio.gather(
+            queue.submit(add_item("first")),
+            queue.submit(add_item("taken")),
+            queue.submit(add_item("second")),
+            return_exceptions=True,
+        )
+        assert results[0] == "first"
+        assert isinstance(results[1], IntegrityError)
+        assert results[2] == "second"
+        assert await stored_names(session_maker) == {"taken", "first", "second"}
+        return queue.stats()
+
+    stats = run_with_queue(tmp_path, scenario, max_delay=0.05)
+    assert stats.failed == 1
+    # Первая запись до start() и две повторно закоммиченные по одной
+    assert stats.jobs == 3
+
+
+def test_stop_commits_submitted_jobs(tmp_path):
+    async def scenario(queue, session_maker):
+        queue.start()
+        pending = asyncio.ensure_future(queue.submit(add_item("late")))
+        await asyncio.sleep(0)
+        await queue.stop()
+        assert await pending == "late"
+        return await stored_names(session_maker)
+
+    assert run_with_queue(tmp_path, scenario, max_delay=0.05) == {"late"}
+
+
+def test_job_error_reaches_caller_before_start(tmp_path):
+    async def scenario(queue, session_maker):
+        await queue.submit(add_item("taken"))
+        with pytest.raises(IntegrityError):
+            await queue.submit(add_item("taken"))
+        return await stored_names(session_maker)
+
+    assert run_with_queue(tmp_path, scenario) == {"taken"}